@@ -34,6 +34,20 @@ def create_app():
     
     from server.app.models.users import User
     from server.app import models 
+    from server.app.utils.catalog_cache import init_catalog_cache
+    from server.app.utils.suggest import init_suggest_index
+    from server.app.utils.trigram import init_trigram_index
+    from server.app.utils.json_provider import init_json_provider
+    from server.app.utils.compression import init_compression
+    from server.app.utils import cart_totals  # registers the cart total hooks
+    from server.app.utils.cart_repository import init_cart_repository
+
+    init_json_provider(app)
+    init_compression(app)
+    init_catalog_cache(app)
+    init_suggest_index(app)
+    init_trigram_index(app)
+    init_cart_repository(app)
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
@@ -80,6 +94,73 @@ def create_app():
         db.create_all()
         click.echo("Initialized the database.")
 
+    @app.cli.command("rebuild-search-index")
+    @with_appcontext
+    def rebuild_search_index_command():
+        """Rebuilds the product full-text search index."""
+        from server.app.utils.fts import rebuild_search_index
+        with db.engine.begin() as connection:
+            rebuild_search_index(connection)
+        click.echo("Rebuilt the search index.")
+
+    @app.cli.command("import-products")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None,
+                  help="File format; guessed from the extension when omitted.")
+    @click.option("--chunk-size", default=1000, show_default=True, help="Rows per INSERT/commit.")
+    @with_appcontext
+    def import_products_command(path, fmt, chunk_size):
+        """Bulk imports products from a CSV or NDJSON file."""
+        from server.app.utils.product_import import detect_format, iter_rows, import_products
+        with open(path, "rb") as stream:
+            report = import_products(iter_rows(stream, detect_format(path, explicit=fmt)), chunk_size=chunk_size)
+        for error in report["errors"]:
+            click.echo(f"Row {error['row']}: {error['error']}", err=True)
+        click.echo(f"Imported {report['imported']} of {report['processed']} rows ({report['failed']} failed).")
+
+    @app.cli.command("adjust-stock")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @with_appcontext
+    def adjust_stock_command(path):
+        """Applies stock changes from a CSV with product_id and delta or stock_qty columns."""
+        import csv
+        from server.app.utils.inventory import parse_stock_adjustments, apply_stock_adjustments
+        with open(path, newline="", encoding="utf-8-sig") as stream:
+            try:
+                mode, quantities = parse_stock_adjustments(csv.DictReader(stream))
+            except ValueError as e:
+                raise click.ClickException(str(e))
+        report = apply_stock_adjustments(mode, quantities)
+        db.session.commit()
+        for product_id in report["unknown_ids"]:
+            click.echo(f"Unknown product: {product_id}", err=True)
+        for product_id in report["rejected_ids"]:
+            click.echo(f"Rejected (stock would go negative): {product_id}", err=True)
+        click.echo(f"Updated {report['updated']} of {report['requested']} products.")
+
+    @app.cli.group("carts")
+    def carts_command():
+        """Cart maintenance."""
+
+    @carts_command.command("purge")
+    @click.option("--older-than", default="30d", show_default=True,
+                  help="Idle time after which open guest carts are deleted (e.g. 30d, 12h, 90m).")
+    @click.option("--batch-size", default=500, show_default=True, help="Carts deleted per transaction.")
+    @with_appcontext
+    def purge_carts_command(older_than, batch_size):
+        """Deletes idle guest carts and their items in batches."""
+        from server.app.utils.cart_utils import parse_duration, purge_guest_carts
+        try:
+            age = parse_duration(older_than)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--older-than")
+        report = purge_guest_carts(age, batch_size=batch_size)
+        click.echo(f"Removed {report['carts']} carts and {report['items']} items "
+                   f"in {report['batches']} batches ({report['seconds']:.2f}s).")
+        store = app.extensions.get("guest_cart_store")
+        if store is not None:
+            click.echo(f"Removed {store.purge_expired()} expired entries from the guest cart store.")
+
     @app.cli.command("seed-db")
     @with_appcontext
     def seed_db_command():
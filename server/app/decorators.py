@@ -1,6 +1,7 @@
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, request, make_response
 from flask_jwt_extended import get_jwt
+from server.app.utils.catalog_cache import catalog_etag
 
 def admin_required():
     def wrapper(fn):
@@ -12,4 +13,26 @@ def admin_required():
             else:
                 return jsonify({"message": "Admins only!"}), 403
         return decorator
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def conditional_catalog_get():
+    """
+    Answer catalog GETs with a strong ETag, and with 304 Not Modified when the
+    client's If-None-Match already matches (the view is never called).
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            etag = catalog_etag(request)
+            # Weak comparison: compressed responses carry the ETag as W/"..."
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return decorator
+    return wrapper
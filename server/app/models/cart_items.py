@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, ForeignKey, Enum, Numeric, String
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Numeric, String, Index
 from sqlalchemy.orm import relationship
 from server.app.extensions import db
 from server.app.models.enums import CartItemStatus
@@ -13,5 +13,10 @@ class CartItem(Base):
     status = Column(Enum(CartItemStatus), default=CartItemStatus.active, nullable=False)
     total_amount = Column(Numeric(10, 2), nullable=False)
 
+    # One line per product: adds upsert into it (utils/cart_utils.upsert_cart_lines)
+    __table_args__ = (
+        Index('uq_cart_items_cart_product', 'cart_id', 'product_id', unique=True),
+    )
+
     cart = relationship("Cart", back_populates="items")
     product = relationship("Product", backref="cart_items")
\ No newline at end of file
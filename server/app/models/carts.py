@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Enum, func, String
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, TIMESTAMP, ForeignKey, Enum, func, String, Index, Integer, Numeric, text
 from sqlalchemy.orm import relationship
 from server.app.extensions import db
 from server.app.models.enums import CartStatus
@@ -13,5 +14,23 @@ class Cart(Base):
 # session_id for guest carts
     session_id = Column(String(128), nullable=True)
 
+    # Running totals over the items, maintained by utils/cart_totals.py
+    grand_total = Column(Numeric(10, 2), nullable=False, default=0, server_default='0')
+    item_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Bumped by every item change (utils/cart_totals.py); idle guest carts are purged on it
+    last_activity_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # Only open carts are ever looked up by owner
+    __table_args__ = (
+        Index('ix_carts_user_open', 'user_id',
+              sqlite_where=text("status = 'open'"), postgresql_where=text("status = 'open'")),
+        Index('ix_carts_session_open', 'session_id',
+              sqlite_where=text("status = 'open'"), postgresql_where=text("status = 'open'")),
+        Index('ix_carts_guest_activity', 'last_activity_at',
+              sqlite_where=text("status = 'open' AND user_id IS NULL"),
+              postgresql_where=text("status = 'open' AND user_id IS NULL")),
+    )
+
     user = relationship("User", back_populates="carts")
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
\ No newline at end of file
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Enum
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from server.app.extensions import db
@@ -15,6 +15,10 @@ class Invoice(Base):
     payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.pending)
     paid_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index('ix_invoices_order_id', 'order_id'),
+    )
+
     order = relationship('Order', backref='invoice')
     user = relationship('User', backref='invoices')
 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, String
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, String, Index
 from sqlalchemy.orm import relationship
 from server.app.extensions import db
 from .base import Base, GUID
@@ -13,6 +13,11 @@ class OrderItem(Base):
     price = Column(Numeric(10, 2), nullable=False)
     sub_total = Column(Numeric(10, 2))
 
+    __table_args__ = (
+        Index('ix_order_items_order_id', 'order_id'),
+        Index('ix_order_items_product_id', 'product_id'),
+    )
+
     order = relationship("Order", back_populates="items")
     product = relationship("Product", backref="order_items")
 
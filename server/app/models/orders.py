@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Enum, Numeric, func, String
+from sqlalchemy import Column, DateTime, ForeignKey, Enum, Numeric, func, String, Index
 from sqlalchemy.orm import relationship
 from server.app.extensions import db
 from server.app.models.enums import OrderStatus
@@ -12,6 +12,12 @@ class Order(Base):
     total_amount = Column(Numeric(10, 2), nullable=False)
     created_at = Column(DateTime, default=func.now())
 
+    __table_args__ = (
+        Index('ix_orders_created_at', 'created_at'),
+        Index('ix_orders_cart_id', 'cart_id'),
+        Index('ix_orders_status_created', 'status', 'created_at'),
+    )
+
     cart = relationship("Cart", backref="order")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     
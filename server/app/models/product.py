@@ -2,7 +2,7 @@ from datetime import datetime
 import uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy import Column, String, Boolean, ForeignKey, Numeric, Integer, Text, DateTime
+from sqlalchemy import Column, String, Boolean, ForeignKey, Numeric, Integer, Text, DateTime, Index
 from server.app.extensions import db
 from .base import Base, GUID
 
@@ -23,6 +23,19 @@ class Product(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Storefront listings only ever look at active products, so the partial
+    # indexes stay small and match the (created_at, id) keyset ordering.
+    __table_args__ = (
+        Index('ix_products_category_id', 'category_id'),
+        Index('ix_products_sub_category_id', 'sub_category_id'),
+        Index('ix_products_active_created', 'created_at', 'id',
+              sqlite_where=status == True, postgresql_where=status == True),
+        Index('ix_products_active_category_created', 'category_id', 'created_at', 'id',
+              sqlite_where=status == True, postgresql_where=status == True),
+        Index('ix_products_active_sub_category_created', 'sub_category_id', 'created_at', 'id',
+              sqlite_where=status == True, postgresql_where=status == True),
+    )
+
     # Relationships
     category = relationship("Category", back_populates="products")
     sub_category = relationship("SubCategory", back_populates="products")
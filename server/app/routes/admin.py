@@ -8,6 +8,7 @@ from server.app.models.orders import Order
 from server.app.models.order_items import OrderItem
 from server.app.models.enums import OrderStatus
 from sqlalchemy.orm import joinedload
+from server.app.utils.projections import user_fieldset
 
 # Allowed transitions
 VALID_STATUS_TRANSITIONS = {
@@ -31,6 +32,11 @@ def get_users():
     search_term = request.args.get('search', None, type=str)
     status = request.args.get('status', 'all', type=str)
 
+    try:
+        fieldset = user_fieldset(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     query = User.query
 
     if search_term:
@@ -47,12 +53,14 @@ def get_users():
     elif status == 'inactive':
         query = query.filter(User.is_active == False)
 
-    paginated_users = query.order_by(User.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    paginated_users = query.order_by(User.created_at.desc())\
+        .with_entities(*fieldset.columns)\
+        .paginate(page=page, per_page=per_page, error_out=False)
     
     users = paginated_users.items
     
     return jsonify({
-        "users": [user.to_dict() for user in users],
+        "users": [fieldset.to_dict(user) for user in users],
         "total": paginated_users.total,
         "pages": paginated_users.pages,
         "current_page": paginated_users.page,
@@ -1,13 +1,35 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from uuid import UUID
-from server.app.extensions import db
-from server.app.models.carts import Cart
-from server.app.models.cart_items import CartItem
-from server.app.models.product import Product
 from server.app.models.enums import CartStatus
+from server.app.utils.cart_utils import parse_cart_lines
+from server.app.utils.cart_repository import sql_carts, guest_cart_store, cart_repository, item_repository
+from server.app.utils.product_utils import load_products
 
 cart_bp = Blueprint("cart", __name__, url_prefix="/api/carts")
 
+# Carts are read and written through a repository (utils/cart_repository.py):
+# user carts always live in SQL, guest carts in the configured guest store.
+
+
+def _items_response(message, cart, status=200):
+    if cart is None:
+        abort(404)
+    return jsonify({
+        "message": message,
+        "cart_id": cart["id"],
+        "grand_total": cart["grand_total"],
+        "item_count": cart["item_count"],
+        "items": cart["items"]
+    }), status
+
+
+def _uuid_or_404(value):
+    try:
+        return UUID(str(value))
+    except ValueError:
+        abort(404)
+
+
 # ------------------ CART CRUD ------------------
 # Create cart (guest or user)
 @cart_bp.route("/", methods=["POST"])
@@ -18,109 +40,49 @@ def create_cart():
     if not user_id and not session_id:
         return jsonify({"error": "user_id or session_id required"}), 400
 
-    cart = Cart(user_id=UUID(user_id) if user_id else None, session_id=session_id)
-    db.session.add(cart)
-    db.session.commit()
-    return jsonify({"id": str(cart.id), "user_id": str(cart.user_id) if cart.user_id else None,
-                    "session_id": cart.session_id, "status": cart.status.name,  "grand_total": 0.0, "items": []}), 201
+    if user_id:
+        cart = sql_carts.create(user_id=user_id, session_id=session_id)
+    else:
+        cart = (guest_cart_store() or sql_carts).create(session_id=session_id)
+    return jsonify(cart), 201
 
 # Get or create cart by user_id or session_id
 @cart_bp.route("/", methods=["GET"])
 def get_cart():
     user_id_str = request.args.get("user_id")
     session_id = request.args.get("session_id")
-    cart = None
 
     if user_id_str:
-        cart = Cart.query.filter_by(user_id=user_id_str, status=CartStatus.open).first()
+        cart = sql_carts.find_open(user_id=user_id_str) or sql_carts.create(user_id=user_id_str)
     elif session_id:
-        cart = Cart.query.filter_by(session_id=session_id, status=CartStatus.open).first()
+        guests = guest_cart_store() or sql_carts
+        # Guest carts written before a guest store was configured are still rows
+        cart = guests.find_open(session_id=session_id) \
+            or (guests is not sql_carts and sql_carts.find_open(session_id=session_id)) \
+            or guests.create(session_id=session_id)
     else:
         return jsonify({"error": "user_id or session_id required"}), 400
 
-    # If no open cart is found, create one
-    if not cart:
-        if user_id_str:
-            cart = Cart(user_id=UUID(user_id_str))
-        elif session_id:
-            cart = Cart(session_id=session_id)
-        
-        db.session.add(cart)
-        db.session.commit()
-    
-    items_data = [
-        {
-            "id": str(item.id),
-            "product": {
-                "id": str(item.product.id),
-                "product_name": item.product.product_name,
-                "price": float(item.product.price),
-                "image_url": item.product.image_url
-            },
-            "quantity": item.quantity,
-            "total_amount": float(item.total_amount)
-        }
-        for item in cart.items
-    ]
-    grand_total = sum(i["total_amount"] for i in items_data)
-
-    return jsonify({
-        "id": str(cart.id),
-        "user_id": str(cart.user_id) if cart.user_id else None,
-        "session_id": cart.session_id,
-        "status": cart.status.name,
-        "grand_total": grand_total,
-        "items": items_data
-    }), 200
+    return jsonify(cart), 200
 
 # Update cart status
 @cart_bp.route("/<uuid:cart_id>", methods=["PUT"])
 def update_cart(cart_id):
-    cart = Cart.query.get_or_404(cart_id)
     status = request.json.get("status")
     if status not in CartStatus.__members__:
         return jsonify({"error": "Invalid status"}), 400
-    cart.status = CartStatus[status]
-    db.session.commit()
-    items_data = [
-        {
-            "id": str(item.id),
-            "product": {
-                "id": str(item.product.id),
-                "product_name": item.product.product_name,
-                "price": float(item.product.price),
-                "image_url": item.product.image_url
-            },
-            "quantity": item.quantity,
-            "total_amount": float(item.total_amount)
-        }
-        for item in cart.items
-    ]
-    grand_total = sum(i["total_amount"] for i in items_data)
-
-    return jsonify({
-        "id": str(cart.id),
-        "user_id": str(cart.user_id) if cart.user_id else None,
-        "session_id": cart.session_id,
-        "status": cart.status.name,
-        "grand_total": grand_total,
-        "items": items_data
-    }), 200
+    cart = cart_repository(cart_id).set_status(cart_id, CartStatus[status])
+    if cart is None:
+        abort(404)
+    return jsonify(cart), 200
 
 # Delete cart
 @cart_bp.route("/<uuid:cart_id>", methods=["DELETE"])
 def delete_cart(cart_id):
-    cart = Cart.query.get_or_404(cart_id)
-    db.session.delete(cart)
-    db.session.commit()
-    return jsonify({
-        "id": str(cart.id),
-        "user_id": str(cart.user_id) if cart.user_id else None,
-        "session_id": cart.session_id,
-        "status": cart.status.name,
-        "grand_total": 0.0,
-        "items": []
-    }), 200
+    cart = cart_repository(cart_id).delete(cart_id)
+    if cart is None:
+        abort(404)
+    return jsonify(cart), 200
 
 # Add item to cart
 @cart_bp.route("/items", methods=["POST"])
@@ -132,124 +94,58 @@ def add_item():
 
     if not cart_id or not product_id:
         return jsonify({"error": "cart_id and product_id are required"}), 400
+    # Same rule as the batch endpoint (parse_cart_lines); the upsert adds it in SQL as given
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return jsonify({"error": "quantity must be an integer >= 1"}), 400
 
-    product = Product.query.get_or_404(product_id)
-    cart = Cart.query.get_or_404(cart_id)
+    product_id, cart_id = _uuid_or_404(product_id), _uuid_or_404(cart_id)
+    products = load_products([product_id])
+    if product_id not in products:
+        abort(404)
 
-    # check if item already exists and update instead of duplicate
-    item = CartItem.query.filter_by(cart_id=cart.id, product_id=product.id).first()
-    if item:
-        item.quantity += quantity
-        item.total_amount = product.price * item.quantity
-    else:
-        item = CartItem(
-            cart_id=UUID(cart_id),
-            product_id=UUID(product_id),
-            quantity=quantity,
-            total_amount=product.price * quantity
-        )
-        db.session.add(item)
-
-    db.session.commit()
-
-    # recalc grand total
-    items_data = [
-        {
-            "id": str(i.id),
-            "product": {
-                "id": str(i.product.id),
-                "product_name": i.product.product_name,
-                "price": float(i.product.price),
-                "image_url": i.product.image_url
-            },
-            "quantity": i.quantity,
-            "total_amount": float(i.total_amount)
-        }
-        for i in cart.items
-    ]
-    grand_total = sum(i["total_amount"] for i in items_data)
+    # adds to the existing line for the product instead of duplicating it
+    cart = cart_repository(cart_id).add_lines(cart_id, {product_id: quantity}, products)
+    return _items_response("Item added successfully", cart, 201)
 
-    return jsonify({
-        "message": "Item added successfully",
-        "cart_id": str(cart.id),
-        "grand_total": grand_total,
-        "items": items_data
-    }), 201
+
+# Add many items at once (POST), or make the cart hold exactly these items (PUT)
+@cart_bp.route("/<uuid:cart_id>/items", methods=["POST", "PUT"])
+def set_items(cart_id):
+    replace = request.method == "PUT"
+    try:
+        quantities = parse_cart_lines((request.json or {}).get("items"), replace=replace)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    products = load_products(quantities)
+    missing = [str(product_id) for product_id in quantities if product_id not in products]
+    if missing:
+        return jsonify({"error": "Products not found", "product_ids": missing}), 404
+
+    # One write for the whole batch
+    cart = cart_repository(cart_id).add_lines(cart_id, quantities, products, replace=replace)
+    if replace:
+        return _items_response("Cart items replaced", cart)
+    return _items_response("Items added successfully", cart, 201)
 
 
 # Update item quantity
 @cart_bp.route("/items/<uuid:item_id>", methods=["PUT"])
 def update_item(item_id):
-    item = CartItem.query.get_or_404(item_id)
     quantity = request.json.get("quantity")
 
     if not quantity or quantity < 1:
         return jsonify({"error": "quantity must be >= 1"}), 400
 
-    product = Product.query.get(item.product_id)
-    if not product:
-        return jsonify({"error": "Product not found"}), 404
-
-    # update and recalc
-    item.quantity = quantity
-    item.total_amount = product.price * quantity
-    cart = item.cart
-
-    db.session.commit()
-
-    items_data = [
-        {
-            "id": str(i.id),
-            "product": {
-                "id": str(i.product.id),
-                "product_name": i.product.product_name,
-                "price": float(i.product.price),
-                "image_url": i.product.image_url
-            },
-            "quantity": i.quantity,
-            "total_amount": float(i.total_amount)
-        }
-        for i in cart.items
-    ]
-    grand_total = sum(i["total_amount"] for i in items_data)
-
-    return jsonify({
-        "message": "Item updated successfully",
-        "cart_id": str(cart.id),
-        "grand_total": grand_total,
-        "items": items_data
-    }), 200
+    try:
+        cart = item_repository(item_id).update_item(item_id, quantity)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    return _items_response("Item updated successfully", cart)
 
 
 # Delete item
 @cart_bp.route("/items/<uuid:item_id>", methods=["DELETE"])
 def delete_item(item_id):
-    item = CartItem.query.get_or_404(item_id)
-    cart = item.cart 
-
-    db.session.delete(item)
-    db.session.commit()
-
-    # recalc grand total after deletion
-    items_data = [
-        {
-            "id": str(i.id),
-            "product": {
-                "id": str(i.product.id),
-                "product_name": i.product.product_name,
-                "price": float(i.product.price),
-                "image_url": i.product.image_url
-            },
-            "quantity": i.quantity,
-            "total_amount": float(i.total_amount)
-        }
-        for i in cart.items
-    ]
-    grand_total = sum(i["total_amount"] for i in items_data)
-
-    return jsonify({
-        "message": "Item deleted",
-        "cart_id": str(cart.id),
-        "grand_total": grand_total,
-        "items": items_data
-    }), 200
\ No newline at end of file
+    cart = item_repository(item_id).delete_item(item_id)
+    return _items_response("Item deleted", cart)
@@ -2,8 +2,10 @@ from flask import Blueprint, request, jsonify
 from server.app.extensions import db
 from server.app.models.category import Category
 from flask_jwt_extended import jwt_required
-from server.app.decorators import admin_required
+from server.app.decorators import admin_required, conditional_catalog_get
 from server.app.models.sub_category import SubCategory
+from server.app.utils.catalog_cache import get_catalog_cache, cache_key
+from server.app.utils.category_tree import build_category_tree
 
 categories_bp = Blueprint("categories", __name__, url_prefix="/api/categories")
 
@@ -21,28 +23,20 @@ def create_category():
 
 
 @categories_bp.route("/", methods=["GET"])
+@conditional_catalog_get()
 def get_categories():
-    categories = Category.query.all()
-
-    result = []
-    for cat in categories:
-        subcategories = SubCategory.query.filter_by(category_id=cat.id).all()
-        result.append({
-            "id": str(cat.id),
-            "category_name": cat.category_name,
-            "subcategories": [
-                {
-                    "id": str(sc.id),
-                    "sub_category_name": sc.sub_category_name
-                } for sc in subcategories
-            ]
-        })
-
-    return jsonify(result)
+    # ?counts=true adds active product counts to every node
+    with_counts = request.args.get("counts", "false").lower() in ("1", "true", "yes")
+    tree = get_catalog_cache().get_or_load(
+        cache_key("categories:tree:counts" if with_counts else "categories:tree"),
+        lambda: build_category_tree(with_counts=with_counts)
+    )
+    return jsonify(tree)
 
 
 
 @categories_bp.route("/<uuid:category_id>", methods=["GET"])
+@conditional_catalog_get()
 def get_category(category_id):
     category = Category.query.get_or_404(category_id)
     subcategories = SubCategory.query.filter_by(category_id=category.id).all()
@@ -12,6 +12,9 @@ from server.app.models.invoice import Invoice
 from server.app.models.payment import Payment
 from server.app.models.users import User
 from server.app.models.enums import OrderStatus, PaymentStatus, PaymentMethod, CartStatus, CartItemStatus
+from server.app.utils.product_utils import load_products
+from server.app.utils.inventory import reserve_stock
+from sqlalchemy import insert
 import json
 
 checkout_bp = Blueprint('checkout', __name__, url_prefix='/api/checkout')
@@ -25,15 +28,20 @@ def calculate_total():
         if 'items' not in data or not isinstance(data['items'], list):
             return jsonify({'error': 'items array is required'}), 400
         
+        for item in data['items']:
+            if 'product_id' not in item or 'quantity' not in item:
+                return jsonify({'error': 'Each item must have product_id and quantity'}), 400
+
+        products = load_products(item['product_id'] for item in data['items'])
+
         total = 0
         calculated_items = []
         
         for item in data['items']:
-            if 'product_id' not in item or 'quantity' not in item:
-                return jsonify({'error': 'Each item must have product_id and quantity'}), 400
-            
             product_uuid = uuid.UUID(item['product_id'])
-            product = Product.query.get_or_404(product_uuid)
+            product = products.get(product_uuid)
+            if not product:
+                return jsonify({'error': f"Product with ID {item['product_id']} not found."}), 404
             
             if product.stock_qty < item['quantity']:
                 return jsonify({'error': f'Insufficient stock for {product.product_name}'}), 400
@@ -97,10 +105,11 @@ def process_checkout():
 
         total = 0
         order_items_data = []
+        products = load_products(item['product_id'] for item in data['items'])
         
         for item in data['items']:
             product_uuid = uuid.UUID(item['product_id'])
-            product = Product.query.get(product_uuid)
+            product = products.get(product_uuid)
             
             if not product:
                  print(f"DEBUG: Product not found for ID: {item['product_id']}")
@@ -123,7 +132,20 @@ def process_checkout():
         
         shipping = 300.0 if total < 5000 else 0
         final_total = total + shipping
-        
+
+        # The check above is advisory; the conditional decrement is what holds
+        # under concurrent checkouts, and nothing is taken unless every line fits
+        reserved = {}
+        for item_data in order_items_data:
+            reserved[item_data['product_uuid']] = reserved.get(item_data['product_uuid'], 0) + item_data['quantity']
+        if not reserve_stock(reserved, products):
+            db.session.rollback()
+            stock = load_products(reserved)
+            short = next((stock[product_id] for product_id, quantity in reserved.items()
+                          if product_id in stock and stock[product_id].stock_qty < quantity), None)
+            name = short.product_name if short else 'one or more products'
+            return jsonify({'error': f'Insufficient stock for {name}'}), 400
+
         if cart:
             cart.status = CartStatus.closed
 
@@ -136,17 +158,18 @@ def process_checkout():
         db.session.add(order)
         db.session.flush()
         
-        for item_data in order_items_data:
-            order_item = OrderItem(
-                id=uuid.uuid4(),
-                order_id=order.id,
-                product_id=item_data['product_uuid'],
-                quantity=item_data['quantity'],
-                price=item_data['price'],
-                sub_total=item_data['subtotal']
-            )
-            db.session.add(order_item)
-            item_data['product'].stock_qty -= item_data['quantity']
+        # All lines in one multi-row INSERT
+        db.session.execute(insert(OrderItem), [
+            {
+                'id': uuid.uuid4(),
+                'order_id': order.id,
+                'product_id': item_data['product_uuid'],
+                'quantity': item_data['quantity'],
+                'price': item_data['price'],
+                'sub_total': item_data['subtotal']
+            }
+            for item_data in order_items_data
+        ])
         
         invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{str(order.id)[:8]}"
         invoice = Invoice(
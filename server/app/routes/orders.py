@@ -8,6 +8,9 @@ from server.app.models.users import User
 from server.app.models.carts import Cart
 from sqlalchemy.orm import joinedload
 from sqlalchemy import or_, cast, String
+from server.app.utils.projections import (
+    project_orders, serialize_orders, parse_fields, raw_guid, guid_str, ORDER_FIELDS
+)
 
 # Allowed transitions
 VALID_STATUS_TRANSITIONS = {
@@ -49,10 +52,13 @@ def get_orders():
     status = request.args.get("status", "all", type=str).lower()
     date_filter = request.args.get("date", "", type=str)  
 
-    query = db.session.query(Order).options(
-            joinedload(Order.cart).joinedload(Cart.user),
-            joinedload(Order.items).joinedload(OrderItem.product)
-        ) 
+    try:
+        fields = parse_fields(request.args.get("fields"), ORDER_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Columns only, customer outer-joined in when needed; items are fetched per page below
+    query = project_orders(db.session.query(Order), fields, join_customer=bool(search))
     
     if status and status != "all":
         try:
@@ -63,7 +69,8 @@ def get_orders():
 
 
     if search:
-            query = query.join(Cart).join(User).filter(
+            query = query.filter(
+                User.id.isnot(None),
                 or_(
                     User.username.ilike(f"%{search}%"),
                     cast(Order.status, String).ilike(f"%{search}%"),
@@ -90,7 +97,7 @@ def get_orders():
         
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    orders = [order.to_dict(include_items=True) for order in pagination.items]
+    orders = serialize_orders(pagination.items, fields)
 
     return jsonify({
         "orders": orders,
@@ -163,17 +170,18 @@ def get_user_order_history():
         Order.query.join(Cart)
         .filter(Cart.user_id == user.id)
         .order_by(Order.created_at.desc())
+        .with_entities(raw_guid(Order.id), Order.status, Order.total_amount, Order.created_at)
         .paginate(page=page, per_page=per_page, error_out=False)
     )
 
     orders = [
         {
-            "id": str(o.id),
-            "status": o.status.value,
-            "total_amount": float(o.total_amount),
-            "created_at": o.created_at.isoformat() if o.created_at else None
+            "id": guid_str(order_id),
+            "status": status.value,
+            "total_amount": float(total_amount),
+            "created_at": created_at.isoformat() if created_at else None
         }
-        for o in pagination.items
+        for order_id, status, total_amount, created_at in pagination.items
     ]
 
     return jsonify({
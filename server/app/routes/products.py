@@ -1,85 +1,250 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 import uuid
 
 from server.app.extensions import db
 from server.app.models.product import Product
 from flask_jwt_extended import jwt_required
-from server.app.decorators import admin_required
+from server.app.decorators import admin_required, conditional_catalog_get
+from server.app.utils.pagination import InvalidCursor, keyset_paginate, MAX_PER_PAGE
+from server.app.utils.catalog_cache import get_catalog_cache, cache_key
+from server.app.utils.product_utils import load_products, parse_product_ids, product_facets, MAX_BATCH_IDS
+from server.app.utils.fts import search_condition
+from server.app.utils.projections import product_fieldset, product_row_serializer, project_products, serialize_products
+from server.app.utils.inventory import parse_stock_adjustments, apply_stock_adjustments, MAX_STOCK_ADJUSTMENTS
+from server.app.utils.product_import import detect_format, iter_rows, import_products, IMPORT_CHUNK_SIZE
 
 products_bp = Blueprint('products', __name__, url_prefix='/api/products')
 
+def _flag(args, name):
+    return args.get(name, 'false').lower() in ('1', 'true', 'yes')
+
+def _load_product_list(args):
+    """Build the product listing payload for the given query args"""
+    category_id = args.get('category_id')
+    sub_category_id = args.get('sub_category_id')
+    search = args.get('search')
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', 10, type=int)
+    sort = args.get('sort', 'desc')
+    fieldset = product_fieldset(args.get('fields'))
+
+    query = Product.query.filter(Product.status == True)
+
+    status = args.get('status')
+
+    if status:
+        query = query.filter_by(status=status)
+    if category_id:
+        query = query.filter_by(category_id=category_id)
+    if sub_category_id:
+        query = query.filter_by(sub_category_id=sub_category_id)
+
+    if search:
+        condition = search_condition(search)
+        if condition is not None:
+            query = query.filter(condition)
+
+    facets = product_facets(query) if _flag(args, 'facets') else None
+
+    if sort == "asc":
+        query = query.order_by(Product.created_at.asc())
+    else:
+        query = query.order_by(Product.created_at.desc())
+
+    # Only the rendered columns are selected; rows never become Product instances
+    query = project_products(query, fieldset)
+
+    # Cursor mode: seek on (created_at, id) and only count when asked to
+    if 'cursor' in args:
+        include_total = _flag(args, 'include_total')
+        per_page = min(max(per_page, 1), MAX_PER_PAGE)
+        items, next_cursor, prev_cursor = keyset_paginate(
+            query, Product,
+            cursor=args.get('cursor'),
+            per_page=per_page,
+            descending=(sort != "asc")
+        )
+
+        response = {
+            'products': serialize_products(items, fieldset),
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'per_page': per_page
+        }
+        if include_total:
+            response['total'] = query.order_by(None).count()
+        if facets is not None:
+            response['facets'] = facets
+        return response
+
+    products = query.paginate(page=page, per_page=per_page, error_out=False)
+
+    response = {
+        'products': serialize_products(products.items, fieldset),
+        'total': products.total,
+        'pages': products.pages,
+        'current_page': page
+    }
+    if facets is not None:
+        response['facets'] = facets
+    return response
+
 @products_bp.route('/', methods=['GET'])
+@conditional_catalog_get()
 def get_all_products():
     """Get all products with optional filtering"""
     try:
-        category_id = request.args.get('category_id')
-        sub_category_id = request.args.get('sub_category_id')
-        search = request.args.get('search')
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        sort = request.args.get('sort', 'desc')  
-        
-        query = Product.query
+        try:
+            product_fieldset(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        cache = get_catalog_cache()
+        payload = cache.get_or_load(
+            cache_key('products:list', request.args),
+            lambda: _load_product_list(request.args)
+        )
+        return jsonify(payload), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        query = Product.query.filter(Product.status == True)
+@products_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@admin_required()
+def get_cache_stats():
+    """Catalog read cache counters, for sizing the cache (Admin only)"""
+    return jsonify(get_catalog_cache().stats()), 200
 
-        status = request.args.get('status')
+@products_bp.route('/batch', methods=['GET'])
+@conditional_catalog_get()
+def get_products_batch():
+    """Get many products by ID in one query (?ids=a,b,c); missing IDs map to null"""
+    raw_ids = [i for value in request.args.getlist('ids') for i in value.split(',') if i.strip()]
+    if not raw_ids:
+        return jsonify({'error': 'ids is required'}), 400
 
-        if status:
-            query = query.filter_by(status=status)
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-        if sub_category_id:
-            query = query.filter_by(sub_category_id=sub_category_id)
-        
-        if search:
-            query = query.filter(Product.product_name.contains(search))
-        
-        if sort == "asc": 
-            query = query.order_by(Product.created_at.asc()) 
-        else:
-            query = query.order_by(Product.created_at.desc())
-        
-        products = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        return jsonify({
-            'products': [product.to_dict() for product in products.items],
-            'total': products.total,
-            'pages': products.pages,
-            'current_page': page
-        }), 200
-        
+    try:
+        product_ids = parse_product_ids(raw_ids)
+    except ValueError:
+        return jsonify({'error': 'Invalid product ID format'}), 400
+
+    if len(product_ids) > MAX_BATCH_IDS:
+        return jsonify({'error': f'At most {MAX_BATCH_IDS} ids per request'}), 400
+
+    def load():
+        found = load_products(product_ids)
+        return {
+            'products': {
+                str(product_id): found[product_id].to_dict() if product_id in found else None
+                for product_id in product_ids
+            },
+            'not_found': [str(product_id) for product_id in product_ids if product_id not in found]
+        }
+
+    try:
+        key = cache_key('products:batch:' + ','.join(sorted(p.hex for p in product_ids)))
+        return jsonify(get_catalog_cache().get_or_load(key, load)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/<string:product_id>', methods=['GET'])
+@conditional_catalog_get()
 def get_product(product_id):
     """Get a single product by ID"""
     try:
         # Manually converts the string to a UUID object for querying
         product_uuid = uuid.UUID(product_id)
-        product = Product.query.get_or_404(product_uuid)
-        return jsonify(product.to_dict()), 200
+        payload = get_catalog_cache().get_or_load(
+            cache_key(f'products:detail:{product_uuid.hex}'),
+            lambda: Product.query.get_or_404(product_uuid).to_dict()
+        )
+        return jsonify(payload), 200
     except ValueError:
         return jsonify({'error': 'Invalid product ID format'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
+STREAM_BATCH_SIZE = 500
+
+def _stream_products(query, fieldset=None):
+    """NDJSON response over a server-side cursor: one product per line, flat memory"""
+    query = project_products(query.order_by(Product.created_at.desc(), Product.id.desc()), fieldset)\
+        .yield_per(STREAM_BATCH_SIZE)
+    dumps = current_app.json.dumps
+    to_dict = product_row_serializer(fieldset)
+
+    def generate():
+        for row in query:
+            yield dumps(to_dict(row)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _products_by(namespace, **filters):
+    """
+    Products for one category/sub-category. A bare request keeps the original
+    full JSON array; per_page/cursor switch to keyset pages and format=ndjson
+    streams every row.
+    """
+    args = request.args
+    try:
+        fieldset = product_fieldset(args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = Product.query.filter_by(**filters)
+    if args.get('format', '').lower() == 'ndjson':
+        return _stream_products(query, fieldset)
+
+    if 'cursor' not in args and 'per_page' not in args:
+        payload = get_catalog_cache().get_or_load(
+            cache_key(namespace, args),
+            lambda: serialize_products(project_products(query, fieldset).all(), fieldset)
+        )
+        return jsonify(payload), 200
+
+    def load_page():
+        per_page = min(max(args.get('per_page', 20, type=int), 1), MAX_PER_PAGE)
+        items, next_cursor, prev_cursor = keyset_paginate(
+            project_products(query, fieldset), Product, cursor=args.get('cursor'), per_page=per_page
+        )
+        return {
+            'products': serialize_products(items, fieldset),
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'per_page': per_page
+        }
+
+    try:
+        payload = get_catalog_cache().get_or_load(cache_key(namespace, args), load_page)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(payload), 200
+
 @products_bp.route('/categories/<string:category_id>', methods=['GET'])
+@conditional_catalog_get()
 def get_category_products(category_id):
     """Get all products for a specific category"""
     try:
-        products = Product.query.filter_by(category_id=category_id).all()
-        return jsonify([product.to_dict() for product in products]), 200
+        try:
+            category_uuid = uuid.UUID(category_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid category ID'}), 400
+        return _products_by(f'products:category:{category_uuid}', category_id=category_uuid)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/subcategories/<string:sub_category_id>', methods=['GET'])
+@conditional_catalog_get()
 def get_subcategory_products(sub_category_id):
     """Get all products for a specific subcategory"""
     try:
-        products = Product.query.filter_by(sub_category_id=sub_category_id).all()
-        return jsonify([product.to_dict() for product in products]), 200
+        try:
+            sub_category_uuid = uuid.UUID(sub_category_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid subcategory ID'}), 400
+        return _products_by(f'products:subcategory:{sub_category_uuid}', sub_category_id=sub_category_uuid)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -125,6 +290,57 @@ def create_product():
         print(f"Error creating product: {e}")
         return jsonify({'error': str(e)}), 500
 
+@products_bp.route('/import', methods=['POST'])
+@jwt_required()
+@admin_required()
+def import_products_route():
+    """Bulk import products from a CSV or NDJSON upload (Admin only)"""
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            stream, filename, content_type = upload.stream, upload.filename, upload.mimetype
+        else:
+            stream, filename, content_type = request.stream, None, request.mimetype
+
+        try:
+            fmt = detect_format(filename, content_type, request.args.get('format'))
+            chunk_size = max(1, int(request.args.get('chunk_size', IMPORT_CHUNK_SIZE)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        report = import_products(iter_rows(stream, fmt), chunk_size=chunk_size)
+        return jsonify(report), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@products_bp.route('/stock-adjustments', methods=['POST'])
+@jwt_required()
+@admin_required()
+def adjust_stock():
+    """Apply a batch of stock deltas or absolute quantities (Admin only)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('adjustments') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'adjustments must be a non-empty list'}), 400
+        if len(items) > MAX_STOCK_ADJUSTMENTS:
+            return jsonify({'error': f'At most {MAX_STOCK_ADJUSTMENTS} adjustments per request'}), 400
+
+        try:
+            mode, quantities = parse_stock_adjustments(items)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        report = apply_stock_adjustments(mode, quantities)
+        db.session.commit()
+        return jsonify(report), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @products_bp.route('/<string:product_id>', methods=['PUT'])
 @jwt_required()
 @admin_required()
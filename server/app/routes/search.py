@@ -1,10 +1,14 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import or_
+from flask import Blueprint, request, jsonify, current_app
 from server.app.models import Product, Category, SubCategory
+from server.app.decorators import conditional_catalog_get
+from server.app.utils.fts import ranked_search
+from server.app.utils.suggest import get_suggest_index
+from server.app.utils.trigram import fuzzy_search
 
 search_bp = Blueprint('search', __name__, url_prefix='/api/search')
 
 @search_bp.route('/', methods=['GET'])
+@conditional_catalog_get()
 def search():
     """
     Searches across products, categories, and sub-categories.
@@ -21,13 +25,15 @@ def search():
 
     search_term = f"%{query}%"
 
-    # Search products by name or description
-    products = Product.query.filter(
-        or_(
-            Product.product_name.ilike(search_term),
-            Product.description.ilike(search_term)
-        )
-    ).limit(20).all()
+    # Search products by name or description, best matches first. Only when
+    # exact matching comes up short do we pay for typo-tolerant matching.
+    products = ranked_search(Product.query, query).limit(20).all()
+    fuzzy = False
+    if len(products) < current_app.config.get("FUZZY_SEARCH_MIN_RESULTS", 3):
+        extra = fuzzy_search(Product.query, query, limit=20 - len(products),
+                             exclude_ids=[p.id for p in products])
+        fuzzy = bool(extra)
+        products += extra
 
     # Search categories
     categories = Category.query.filter(
@@ -41,6 +47,22 @@ def search():
 
     return jsonify({
         "products": [p.to_dict() for p in products],
+        "fuzzy": fuzzy,
         "categories": [{"id": str(c.id), "category_name": c.category_name} for c in categories],
         "sub_categories": [{"id": str(sc.id), "sub_category_name": sc.sub_category_name} for sc in sub_categories]
-    })
\ No newline at end of file
+    })
+
+@search_bp.route('/suggest', methods=['GET'])
+def suggest():
+    """
+    Prefix autocomplete over product, category and sub-category names.
+    Accepts 'prefix' and an optional 'limit' (default 10, max 25).
+    Served from the in-memory prefix index, not the database.
+    """
+    prefix = request.args.get('prefix', '').strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 25)
+
+    return jsonify({
+        "prefix": prefix,
+        "suggestions": get_suggest_index().suggest(prefix, limit) if prefix else []
+    })
@@ -3,7 +3,7 @@ from server.app.extensions import db
 from server.app.models.sub_category import SubCategory
 from server.app.models.category import Category
 from flask_jwt_extended import jwt_required
-from server.app.decorators import admin_required
+from server.app.decorators import admin_required, conditional_catalog_get
 
 sub_categories_bp = Blueprint("sub_categories", __name__, url_prefix="/api/sub_categories")
 
@@ -30,6 +30,7 @@ def create_sub_category():
 
 
 @sub_categories_bp.route("/", methods=["GET"])
+@conditional_catalog_get()
 def get_sub_categories():
     sub_categories = SubCategory.query.all()
     return jsonify([
@@ -42,6 +43,7 @@ def get_sub_categories():
 
 
 @sub_categories_bp.route("/<uuid:sub_category_id>", methods=["GET"])
+@conditional_catalog_get()
 def get_sub_category(sub_category_id):
     sub_category = SubCategory.query.get_or_404(sub_category_id)
     return jsonify({
@@ -73,6 +75,7 @@ def delete_sub_category(sub_category_id):
     return jsonify({"message": "SubCategory deleted"})
 
 @sub_categories_bp.route("/by_category/<uuid:category_id>", methods=["GET"])
+@conditional_catalog_get()
 def get_sub_categories_by_category(category_id):
     """
     Get all sub-categories for a specific parent category.
@@ -0,0 +1,490 @@
+"""
+Where carts live.
+
+Every cart route goes through a repository. SqlCartRepository keeps carts as
+rows in carts / cart_items, the only home of user carts. Guest carts can
+instead live in a key-value store (GuestCartRepository), so anonymous
+traffic, which is mostly writes, never commits to the database. A guest
+cart reaches SQL only when it is merged into a user cart on login.
+Checkout requires a user, so that covers checkout too.
+
+GUEST_CART_BACKEND picks where guest carts are kept:
+    "sql"     ordinary rows, like user carts (default)
+    "memory"  a dict in this process; tests and single-worker servers
+    "sqlite"  a WAL-mode SQLite file (GUEST_CART_SQLITE_PATH) that all the
+              workers on a host share
+Guest carts in a store expire GUEST_CART_TTL seconds after their last write.
+
+Both repositories return carts as the dict the routes render:
+{id, user_id, session_id, status, grand_total, item_count, items}.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from server.app.extensions import db
+from server.app.models.carts import Cart
+from server.app.models.cart_items import CartItem
+from server.app.models.enums import CartStatus
+from server.app.utils.cart_utils import cart_items_payload, upsert_cart_lines
+from server.app.utils.product_utils import load_products
+
+GUEST_CART_TTL = 30 * 24 * 3600
+
+
+class SqlCartRepository:
+    """Carts as rows; their totals are kept by the item hooks in utils/cart_totals.py."""
+
+    def view(self, cart, empty=False):
+        return {
+            "id": str(cart.id),
+            "user_id": str(cart.user_id) if cart.user_id else None,
+            "session_id": cart.session_id,
+            "status": cart.status.name,
+            "grand_total": 0.0 if empty else float(cart.grand_total),
+            "item_count": 0 if empty else cart.item_count,
+            "items": [] if empty else cart_items_payload(cart.id)
+        }
+
+    def find_open(self, user_id=None, session_id=None):
+        if user_id:
+            cart = Cart.query.filter_by(user_id=user_id, status=CartStatus.open).first()
+        else:
+            cart = Cart.query.filter_by(session_id=session_id, status=CartStatus.open).first()
+        return self.view(cart) if cart else None
+
+    def create(self, user_id=None, session_id=None):
+        cart = Cart(user_id=uuid.UUID(str(user_id)) if user_id else None, session_id=session_id)
+        db.session.add(cart)
+        db.session.commit()
+        return self.view(cart, empty=True)
+
+    def get(self, cart_id):
+        cart = db.session.get(Cart, cart_id)
+        return self.view(cart) if cart else None
+
+    def set_status(self, cart_id, status):
+        cart = db.session.get(Cart, cart_id)
+        if cart is None:
+            return None
+        cart.status = status
+        cart.last_activity_at = datetime.now(timezone.utc)
+        db.session.commit()
+        return self.view(cart)
+
+    def delete(self, cart_id):
+        cart = db.session.get(Cart, cart_id)
+        if cart is None:
+            return None
+        view = self.view(cart, empty=True)
+        db.session.delete(cart)
+        db.session.commit()
+        return view
+
+    def add_lines(self, cart_id, quantities, products, replace=False):
+        """
+        Add {product_id: quantity} to the cart with one upsert, or with replace
+        make the cart hold exactly those lines (quantity 0 drops a line). One
+        commit, however many lines there are.
+        """
+        cart = db.session.get(Cart, cart_id)
+        if cart is None:
+            return None
+
+        if not replace:
+            upsert_cart_lines(cart.id, [(product_id, quantity, products[product_id].price)
+                                        for product_id, quantity in quantities.items()])
+            db.session.commit()
+            return self.view(cart)
+
+        existing = {item.product_id: item for item in CartItem.query.filter(CartItem.cart_id == cart.id)}
+        for product_id, quantity in quantities.items():
+            price = products[product_id].price
+            item = existing.pop(product_id, None)
+            if item is None:
+                if quantity:
+                    db.session.add(CartItem(cart_id=cart.id, product_id=product_id,
+                                            quantity=quantity, total_amount=price * quantity))
+            elif quantity == 0:
+                db.session.delete(item)
+            else:
+                item.quantity = quantity
+                item.total_amount = price * quantity
+        for item in existing.values():
+            db.session.delete(item)
+
+        db.session.commit()
+        return self.view(cart)
+
+    def update_item(self, item_id, quantity):
+        item = db.session.get(CartItem, item_id)
+        if item is None:
+            return None
+        product = load_products([item.product_id]).get(item.product_id)
+        if product is None:
+            raise LookupError("Product not found")
+        item.quantity = quantity
+        item.total_amount = product.price * quantity
+        cart = item.cart
+        db.session.commit()
+        return self.view(cart)
+
+    def delete_item(self, item_id):
+        item = db.session.get(CartItem, item_id)
+        if item is None:
+            return None
+        cart = item.cart
+        db.session.delete(item)
+        db.session.commit()
+        return self.view(cart)
+
+
+class MemoryCartBackend:
+    """Key-value store in a dict, for tests and single-process servers."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def update(self, key, fn, ttl):
+        """Atomically replace key's value with fn(value); fn returning None deletes it."""
+        with self._lock:
+            value = fn(self.get(key))
+            if value is None:
+                self._values.pop(key, None)
+            else:
+                self.set(key, value, ttl)
+            return value
+
+    def purge_expired(self):
+        with self._lock:
+            now = time.time()
+            expired = [key for key, (_, expires_at) in self._values.items() if expires_at < now]
+            for key in expired:
+                del self._values[key]
+            return len(expired)
+
+
+class SqliteCartBackend:
+    """
+    Key-value store in a SQLite file in WAL mode. Readers never block the
+    writer, and every worker process on the host sees the same carts.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS guest_carts "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key, connection=None):
+        row = (connection or self._connection()).execute(
+            "SELECT value FROM guest_carts WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl, connection=None):
+        (connection or self._connection()).execute(
+            "INSERT OR REPLACE INTO guest_carts (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl)
+        )
+
+    def delete(self, *keys):
+        self._connection().executemany("DELETE FROM guest_carts WHERE key = ?", [(key,) for key in keys])
+
+    def update(self, key, fn, ttl):
+        """Atomically replace key's value with fn(value); fn returning None deletes it."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            value = fn(self.get(key, connection))
+            if value is None:
+                connection.execute("DELETE FROM guest_carts WHERE key = ?", (key,))
+            else:
+                self.set(key, value, ttl, connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return value
+
+    def purge_expired(self):
+        return self._connection().execute(
+            "DELETE FROM guest_carts WHERE expires_at < ?", (time.time(),)
+        ).rowcount
+
+
+class GuestCartRepository:
+    """
+    Guest carts as JSON documents in a key-value backend:
+        cart:<id>          {"id", "session_id", "status", "items": [line]}
+        session:<id>       id of the session's open cart
+        item:<id>          id of the cart holding the line
+    Each line keeps the product's name, price and image as of its last write,
+    so reading a guest cart needs no database round trip.
+    """
+
+    def __init__(self, backend, ttl=GUEST_CART_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _load(self, cart_id):
+        value = self.backend.get(f"cart:{cart_id}")
+        return json.loads(value) if value else None
+
+    def _update(self, cart_id, fn):
+        def apply(value):
+            if value is None:
+                return None
+            cart = fn(json.loads(value))
+            return None if cart is None else json.dumps(cart)
+
+        value = self.backend.update(f"cart:{cart_id}", apply, self.ttl)
+        if value is None:
+            return None
+        cart = json.loads(value)
+        # The line index lives as long as the cart document
+        for line in cart["items"]:
+            self.backend.set(f"item:{line['id']}", cart["id"], self.ttl)
+        # So does the session pointer while the cart is open, unless the session moved on
+        if cart["status"] == CartStatus.open.name:
+            session_key = f"session:{cart['session_id']}"
+            if self.backend.get(session_key) in (None, cart["id"]):
+                self.backend.set(session_key, cart["id"], self.ttl)
+        return cart
+
+    @staticmethod
+    def view(cart):
+        return {
+            "id": cart["id"],
+            "user_id": None,
+            "session_id": cart["session_id"],
+            "status": cart["status"],
+            "grand_total": round(sum(line["total_amount"] for line in cart["items"]), 2),
+            "item_count": sum(line["quantity"] for line in cart["items"]),
+            "items": cart["items"]
+        }
+
+    @staticmethod
+    def _line(product, quantity, line_id=None):
+        return {
+            "id": line_id or str(uuid.uuid4()),
+            "product": {
+                "id": str(product.id),
+                "product_name": product.product_name,
+                "price": float(product.price),
+                "image_url": product.image_url
+            },
+            "quantity": quantity,
+            "total_amount": float(product.price * quantity)
+        }
+
+    def find_open(self, session_id=None, user_id=None):
+        cart_id = self.backend.get(f"session:{session_id}")
+        cart = self._load(cart_id) if cart_id else None
+        return self.view(cart) if cart and cart["status"] == CartStatus.open.name else None
+
+    def create(self, session_id=None, user_id=None):
+        cart = {"id": str(uuid.uuid4()), "session_id": session_id, "status": CartStatus.open.name, "items": []}
+        self.backend.set(f"cart:{cart['id']}", json.dumps(cart), self.ttl)
+        self.backend.set(f"session:{session_id}", cart["id"], self.ttl)
+        return self.view(cart)
+
+    def has_cart(self, cart_id):
+        return self.backend.get(f"cart:{cart_id}") is not None
+
+    def has_item(self, item_id):
+        return self.backend.get(f"item:{item_id}") is not None
+
+    def get(self, cart_id):
+        cart = self._load(cart_id)
+        return self.view(cart) if cart else None
+
+    def set_status(self, cart_id, status):
+        def change(cart):
+            cart["status"] = status.name
+            return cart
+
+        cart = self._update(cart_id, change)
+        if cart is None:
+            return None
+        if status != CartStatus.open:
+            self.backend.delete(f"session:{cart['session_id']}")
+        return self.view(cart)
+
+    def delete(self, cart_id):
+        cart = self._load(cart_id)
+        if cart is None:
+            return None
+        self.backend.delete(f"cart:{cart_id}", *(f"item:{line['id']}" for line in cart["items"]))
+        if self.backend.get(f"session:{cart['session_id']}") == cart_id:
+            self.backend.delete(f"session:{cart['session_id']}")
+        cart["items"] = []
+        return self.view(cart)
+
+    def add_lines(self, cart_id, quantities, products, replace=False):
+        """Same contract as SqlCartRepository.add_lines, as one atomic document update."""
+        def merge(cart):
+            lines = {uuid.UUID(line["product"]["id"]): line for line in cart["items"]}
+            if replace:
+                lines = {product_id: line for product_id, line in lines.items() if product_id in quantities}
+            for product_id, quantity in quantities.items():
+                line = lines.get(product_id)
+                if not replace and line is not None:
+                    quantity += line["quantity"]
+                if quantity:
+                    lines[product_id] = self._line(products[product_id], quantity, line and line["id"])
+                else:
+                    lines.pop(product_id, None)
+            cart["items"] = list(lines.values())
+            return cart
+
+        cart = self._update(cart_id, merge)
+        return self.view(cart) if cart else None
+
+    def _find_line(self, item_id):
+        """(cart id, line) for a line id, or (None, None)."""
+        cart_id = self.backend.get(f"item:{item_id}")
+        cart = self._load(cart_id) if cart_id else None
+        for line in cart["items"] if cart else ():
+            if line["id"] == str(item_id):
+                return cart_id, line
+        return None, None
+
+    def _replace_line(self, cart_id, item_id, new_lines):
+        def change(cart):
+            cart["items"] = [new for line in cart["items"]
+                             for new in (new_lines if line["id"] == str(item_id) else [line])]
+            return cart
+
+        cart = self._update(cart_id, change)
+        return self.view(cart) if cart else None
+
+    def update_item(self, item_id, quantity):
+        cart_id, line = self._find_line(item_id)
+        if line is None:
+            return None
+        product_id = uuid.UUID(line["product"]["id"])
+        product = load_products([product_id]).get(product_id)
+        if product is None:
+            raise LookupError("Product not found")
+        return self._replace_line(cart_id, item_id, [self._line(product, quantity, line["id"])])
+
+    def delete_item(self, item_id):
+        cart_id, line = self._find_line(item_id)
+        if line is None:
+            return None
+        self.backend.delete(f"item:{item_id}")
+        return self._replace_line(cart_id, item_id, [])
+
+    def take(self, session_id):
+        """
+        Remove the session's open guest cart and return its document, or None
+        when there is none. The merge on login calls this; it is the point
+        where a guest cart is written to SQL. Taking is atomic, so two logins
+        cannot both merge the same cart. If the SQL write fails, hand the
+        document back with restore().
+        """
+        cart_id = self.backend.get(f"session:{session_id}")
+        if cart_id is None:
+            return None
+        taken = []
+
+        def pop(value):
+            if value:
+                taken.append(json.loads(value))
+            return None
+
+        self.backend.update(f"cart:{cart_id}", pop, self.ttl)
+        self.backend.delete(f"session:{session_id}")
+        if not taken or taken[0]["status"] != CartStatus.open.name:
+            return None
+        self.backend.delete(*(f"item:{line['id']}" for line in taken[0]["items"]))
+        return taken[0]
+
+    def restore(self, cart):
+        """Put back a cart document removed by take()."""
+        self.backend.set(f"cart:{cart['id']}", json.dumps(cart), self.ttl)
+        self.backend.set(f"session:{cart['session_id']}", cart["id"], self.ttl)
+        for line in cart["items"]:
+            self.backend.set(f"item:{line['id']}", cart["id"], self.ttl)
+
+    @staticmethod
+    def quantities(cart):
+        """{product_id: quantity} of a cart document."""
+        return {uuid.UUID(line["product"]["id"]): line["quantity"] for line in cart["items"]}
+
+    def purge_expired(self):
+        return self.backend.purge_expired()
+
+
+sql_carts = SqlCartRepository()
+
+
+def init_cart_repository(app):
+    """Install the guest cart store GUEST_CART_BACKEND asks for ("sql" installs none)."""
+    backend = app.config.get("GUEST_CART_BACKEND", os.environ.get("GUEST_CART_BACKEND", "sql"))
+    ttl = app.config.get("GUEST_CART_TTL", GUEST_CART_TTL)
+    if backend == "memory":
+        app.extensions["guest_cart_store"] = GuestCartRepository(MemoryCartBackend(), ttl)
+    elif backend == "sqlite":
+        path = app.config.get("GUEST_CART_SQLITE_PATH", os.path.join(app.instance_path, "guest_carts.db"))
+        app.extensions["guest_cart_store"] = GuestCartRepository(SqliteCartBackend(path), ttl)
+    elif backend == "sql":
+        app.extensions["guest_cart_store"] = None
+    else:
+        raise ValueError(f"Unknown GUEST_CART_BACKEND {backend!r}")
+
+
+def guest_cart_store():
+    """The app's guest cart store, or None when guest carts are kept in SQL."""
+    return current_app.extensions.get("guest_cart_store")
+
+
+def cart_repository(cart_id):
+    """The repository holding cart_id: the guest store if the cart is there, SQL otherwise."""
+    store = guest_cart_store()
+    return store if store is not None and store.has_cart(cart_id) else sql_carts
+
+
+def item_repository(item_id):
+    """The repository holding the cart line item_id."""
+    store = guest_cart_store()
+    return store if store is not None and store.has_item(item_id) else sql_carts
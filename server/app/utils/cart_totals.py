@@ -0,0 +1,121 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session, attributes
+
+from server.app.models.carts import Cart
+from server.app.models.cart_items import CartItem
+
+# Cart.grand_total / Cart.item_count (sum of line totals / sum of quantities)
+# are kept in step with cart_items by the mapper hooks below: every ORM insert,
+# update or delete of a CartItem adds its delta to the cart row with an
+# in-database increment, inside the same flush and transaction. Bulk
+# statements on cart_items bypass the hooks and must call
+# recalculate_cart_totals() for the carts they touched, holding lock_carts()
+# on them from before the bulk statement. Both also bump
+# Cart.last_activity_at, which the guest cart purge keys on.
+
+carts = Cart.__table__
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def _apply_delta(connection, cart_id, amount, count):
+    if cart_id is None or (not amount and not count):
+        return
+    connection.execute(
+        update(carts)
+        .where(carts.c.id == cart_id)
+        .values(grand_total=carts.c.grand_total + amount, item_count=carts.c.item_count + count,
+                last_activity_at=datetime.now(timezone.utc))
+    )
+
+
+def _as_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _expire_totals(session, cart_ids):
+    for cart_id in cart_ids:
+        cart = session.identity_map.get(session.identity_key(Cart, _as_uuid(cart_id)))
+        if cart is not None:
+            session.expire(cart, ["grand_total", "item_count", "last_activity_at"])
+
+
+def _remember(target, *cart_ids):
+    session = attributes.instance_state(target).session
+    if session is not None:
+        session.info.setdefault("touched_carts", set()).update(c for c in cart_ids if c is not None)
+
+
+@event.listens_for(CartItem, "after_insert")
+def _item_inserted(mapper, connection, target):
+    _apply_delta(connection, target.cart_id, _money(target.total_amount), target.quantity or 0)
+    _remember(target, target.cart_id)
+
+
+@event.listens_for(CartItem, "after_delete")
+def _item_deleted(mapper, connection, target):
+    _apply_delta(connection, target.cart_id, -_money(target.total_amount), -(target.quantity or 0))
+    _remember(target, target.cart_id)
+
+
+@event.listens_for(CartItem, "after_update")
+def _item_updated(mapper, connection, target):
+    state = attributes.instance_state(target)
+
+    def before(name):
+        history = state.attrs[name].history
+        return history.deleted[0] if history.deleted else getattr(target, name)
+
+    old_cart, old_total, old_quantity = before("cart_id"), before("total_amount"), before("quantity")
+    if old_cart != target.cart_id:
+        _apply_delta(connection, old_cart, -_money(old_total), -(old_quantity or 0))
+        _apply_delta(connection, target.cart_id, _money(target.total_amount), target.quantity or 0)
+    else:
+        _apply_delta(connection, target.cart_id,
+                     _money(target.total_amount) - _money(old_total),
+                     (target.quantity or 0) - (old_quantity or 0))
+    _remember(target, old_cart, target.cart_id)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_touched_carts(session, flush_context):
+    # The increments ran in SQL, so any loaded Cart holds stale totals
+    _expire_totals(session, session.info.pop("touched_carts", ()))
+
+
+def lock_carts(session, cart_ids):
+    """
+    Lock the given cart rows (SELECT ... FOR UPDATE) until the transaction ends.
+    A recalculation reads the items from its statement's snapshot, so without
+    the lock two requests adding different lines to one cart under READ
+    COMMITTED could each write a total missing the other's line. SQLite has
+    no row locks; its single writer already serializes the transactions.
+    """
+    cart_ids = [cart_id for cart_id in cart_ids if cart_id is not None]
+    if cart_ids:
+        session.execute(select(carts.c.id).where(carts.c.id.in_(cart_ids)).with_for_update())
+
+
+def recalculate_cart_totals(session, cart_ids):
+    """Recompute the stored totals of the given carts from their items with one UPDATE."""
+    cart_ids = [cart_id for cart_id in cart_ids if cart_id is not None]
+    if not cart_ids:
+        return
+    items = CartItem.__table__
+    session.execute(
+        update(carts)
+        .where(carts.c.id.in_(cart_ids))
+        .values(
+            grand_total=select(func.coalesce(func.sum(items.c.total_amount), 0))
+            .where(items.c.cart_id == carts.c.id).scalar_subquery(),
+            item_count=select(func.coalesce(func.sum(items.c.quantity), 0))
+            .where(items.c.cart_id == carts.c.id).scalar_subquery(),
+            last_activity_at=datetime.now(timezone.utc)
+        )
+    )
+    _expire_totals(session, cart_ids)
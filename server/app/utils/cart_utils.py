@@ -1,49 +1,231 @@
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, exists, func, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
 from server.app.extensions import db
 from server.app.models.carts import Cart
 from server.app.models.cart_items import CartItem
 from server.app.models.enums import CartStatus
+from server.app.models.orders import Order
 from server.app.models.product import Product
+from server.app.utils.cart_totals import lock_carts, recalculate_cart_totals
+from server.app.utils.projections import raw_guid, raw_number, guid_str, money
 
 def merge_guest_cart(user_id, session_id):
     """
     Merge a guest cart (identified by session_id) into the user's cart.
+
+    Set-based: the guest lines (summed per product, with current prices) and
+    the user's matching lines are read with one query each, then applied with
+    one bulk UPDATE, one bulk INSERT and one bulk DELETE, so login costs the
+    same however many items the guest cart holds. A guest cart kept in the
+    guest cart store (utils/cart_repository.py) is written to SQL here.
     """
+    store = current_app.extensions.get("guest_cart_store")
+    stored_cart = store.take(session_id) if store is not None else None
+    if stored_cart is not None:
+        try:
+            return _merge_into_user_cart(user_id, _priced_lines(store.quantities(stored_cart)))
+        except Exception:
+            # Nothing reached SQL, so the guest keeps their cart
+            db.session.rollback()
+            store.restore(stored_cart)
+            raise
+
     guest_cart = Cart.query.filter_by(session_id=session_id, status=CartStatus.open).first()
     if not guest_cart:
         return None
 
-    user_cart = Cart.query.filter_by(user_id=user_id, status=CartStatus.open).first()
+    user_cart = _open_user_cart(user_id)
+    if not user_cart:
+        # Nothing to merge into: the guest cart becomes the user's cart
+        guest_cart.user_id = user_id
+        guest_cart.session_id = None
+        db.session.commit()
+        return guest_cart
+
+    # Lines whose product no longer exists drop out of the join and are discarded
+    guest_lines = db.session.execute(
+        select(CartItem.product_id, func.sum(CartItem.quantity), Product.price)
+        .join(Product, CartItem.product_id == Product.id)
+        .where(CartItem.cart_id == guest_cart.id)
+        .group_by(CartItem.product_id, Product.price)
+    ).all()
+
+    # Delete the guest lines and the now-empty guest cart
+    db.session.execute(delete(CartItem).where(CartItem.cart_id == guest_cart.id))
+    db.session.execute(delete(Cart).where(Cart.id == guest_cart.id))
+    return _merge_into_user_cart(user_id, guest_lines, user_cart)
+
+
+def _open_user_cart(user_id):
+    return Cart.query.filter_by(user_id=user_id, status=CartStatus.open).first()
+
+
+def _priced_lines(quantities):
+    """{product_id: quantity} -> [(product_id, quantity, current price)], one query; unknown products drop out."""
+    if not quantities:
+        return []
+    prices = dict(db.session.execute(select(Product.id, Product.price).where(Product.id.in_(list(quantities)))).all())
+    return [(product_id, quantity, prices[product_id]) for product_id, quantity in quantities.items()
+            if product_id in prices]
+
+
+def _merge_into_user_cart(user_id, guest_lines, user_cart=None):
+    """Add [(product_id, quantity, price)] to the user's open cart with one upsert, then commit."""
+    user_cart = user_cart or _open_user_cart(user_id)
     if not user_cart:
         user_cart = Cart(user_id=user_id)
         db.session.add(user_cart)
         db.session.flush()
 
-    for item in list(guest_cart.items):
-        existing_item = CartItem.query.filter_by(
-            cart_id=user_cart.id, product_id=item.product_id
-        ).first()
-
-        product = Product.query.get(item.product_id)
-        if not product:
-            db.session.delete(item)
-            continue
-
-        if existing_item:
-            existing_item.quantity += item.quantity
-            existing_item.total_amount = existing_item.quantity * product.price
-            db.session.delete(item)
-        else:
-            new_item = CartItem(
-                cart_id=user_cart.id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                total_amount=item.quantity * product.price
-            )
-            db.session.add(new_item)
-            db.session.delete(item)
-
-    # Delete the now-empty guest cart
-    db.session.delete(guest_cart)
+    upsert_cart_lines(user_cart.id, guest_lines)
     db.session.commit()
 
-    return user_cart
\ No newline at end of file
+    return user_cart
+
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert_cart_lines(cart_id, lines):
+    """
+    Add [(product_id, quantity, price)] to a cart with one
+    INSERT ... ON CONFLICT (cart_id, product_id) DO UPDATE, so concurrent adds
+    of the same product can neither duplicate the line nor lose an increment.
+    A line that already exists is repriced at the product's current price.
+    The statement bypasses the item hooks, so the cart's totals are
+    recalculated here, in the caller's transaction, with the cart row locked
+    first so concurrent adds to the same cart cannot drift its totals.
+    """
+    if not lines:
+        return
+    lock_carts(db.session, [cart_id])
+    items, products = CartItem.__table__, Product.__table__
+    now = datetime.now(timezone.utc)
+    statement = _UPSERT_INSERTS[db.session.get_bind().dialect.name](items).values([
+        {"id": uuid.uuid4(), "cart_id": cart_id, "product_id": product_id, "quantity": quantity,
+         "total_amount": price * quantity, "created_at": now, "updated_at": now}
+        for product_id, quantity, price in lines
+    ])
+    quantity = items.c.quantity + statement.excluded.quantity
+    # Spelled as a literal: SQLAlchemy would add statement.excluded to the subquery's FROM
+    price = select(products.c.price).where(products.c.id == literal_column("excluded.product_id")).scalar_subquery()
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[items.c.cart_id, items.c.product_id],
+        set_={"quantity": quantity, "total_amount": quantity * price, "updated_at": now}
+    ))
+    recalculate_cart_totals(db.session, [cart_id])
+
+
+def cart_items_payload(cart_id):
+    """
+    Serialized items of a cart, each with its product, from one joined query
+    (so the cost stays the same however many items the cart holds).
+    """
+    rows = db.session.query(
+        raw_guid(CartItem.id), CartItem.quantity, raw_number(CartItem.total_amount),
+        raw_guid(Product.id), Product.product_name, raw_number(Product.price), Product.image_url
+    ).join(Product, CartItem.product_id == Product.id)\
+        .filter(CartItem.cart_id == cart_id)\
+        .order_by(CartItem.created_at, CartItem.id).all()
+
+    return [
+        {
+            "id": guid_str(item_id),
+            "product": {
+                "id": guid_str(product_id),
+                "product_name": product_name,
+                "price": money(price),
+                "image_url": image_url
+            },
+            "quantity": quantity,
+            "total_amount": money(total_amount)
+        }
+        for item_id, quantity, total_amount, product_id, product_name, price, image_url in rows
+    ]
+
+
+MAX_CART_LINES = 100
+
+
+def parse_cart_lines(lines, replace=False):
+    """
+    Turn [{'product_id', 'quantity'}] into {UUID: quantity}, keeping order.
+    Repeated products add up, or the last one wins when replacing. Quantities
+    must be >= 1 (>= 0 when replacing, where 0 removes the line).
+    Raises ValueError.
+    """
+    if not isinstance(lines, list) or not lines:
+        raise ValueError("items must be a non-empty list")
+    if len(lines) > MAX_CART_LINES:
+        raise ValueError(f"At most {MAX_CART_LINES} items per request")
+
+    quantities = {}
+    for index, line in enumerate(lines, start=1):
+        if not isinstance(line, dict) or not line.get("product_id"):
+            raise ValueError(f"Item {index}: product_id is required")
+        try:
+            product_id = uuid.UUID(str(line["product_id"]))
+        except ValueError:
+            raise ValueError(f"Item {index}: invalid product_id")
+        quantity = line.get("quantity", 1)
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < (0 if replace else 1):
+            raise ValueError(f"Item {index}: quantity must be an integer >= {0 if replace else 1}")
+        quantities[product_id] = quantity if replace else quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+_DURATION = re.compile(r"^\s*(\d+)\s*([dhm]?)\s*$")
+_DURATION_UNITS = {"d": "days", "h": "hours", "m": "minutes", "": "days"}
+
+
+def parse_duration(raw):
+    """'30d', '12h', '90m' (or a bare number of days) -> timedelta. Raises ValueError."""
+    match = _DURATION.match(str(raw))
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid duration {raw!r}; use e.g. 30d, 12h or 90m")
+    return timedelta(**{_DURATION_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def purge_guest_carts(older_than, batch_size=500):
+    """
+    Delete open guest carts idle for longer than older_than (a timedelta), with
+    their items, batch_size carts per transaction so no write lock is held for
+    long. Carts referenced by an order are kept.
+    Returns {"carts", "items", "batches", "seconds"}.
+    """
+    started = time.perf_counter()
+    cutoff = datetime.now(timezone.utc) - older_than
+    expired = (
+        Cart.user_id.is_(None),
+        Cart.status == CartStatus.open,
+        Cart.last_activity_at < cutoff,
+        ~exists().where(Order.cart_id == Cart.id),
+    )
+    report = {"carts": 0, "items": 0, "batches": 0}
+
+    while True:
+        cart_ids = db.session.scalars(select(Cart.id).where(*expired).limit(batch_size)).all()
+        if not cart_ids:
+            break
+        # Re-check inside the delete, so a cart touched since the SELECT survives
+        still_expired = select(Cart.id).where(Cart.id.in_(cart_ids), *expired).scalar_subquery()
+        report["items"] += db.session.execute(
+            delete(CartItem).where(CartItem.cart_id.in_(still_expired)),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        report["carts"] += db.session.execute(
+            delete(Cart).where(Cart.id.in_(still_expired)),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        db.session.commit()
+        report["batches"] += 1
+        if len(cart_ids) < batch_size:
+            break
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,167 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, has_request_context
+from sqlalchemy import select, func
+
+from server.app.extensions import db
+from server.app.utils.catalog_events import catalog_changed, CATALOG_MODELS
+
+
+class CatalogCache:
+    """
+    Process-local LRU cache (with a per-entry TTL) for serialized catalog reads.
+
+    Entries are dropped wholesale whenever a transaction that touched a
+    Product, Category or SubCategory commits. Every invalidation bumps
+    `generation`, and a value loaded under an older generation is never
+    stored, so a slow reader cannot put stale data back after a write.
+
+    An entry can also carry encoded variants of the response body built from
+    it (see set_encoded), which live and die with the entry.
+    """
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, _ = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl, {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, track=True):
+        """
+        Return the cached value for key, calling loader() on a miss.
+
+        With track set, the key is remembered on flask.g as the one the current
+        response is built from, so its encoded body can be cached with it.
+        """
+        value = self.get(key)
+        if value is None:
+            generation = self.generation
+            value = loader()
+            self.set(key, value, generation)
+        if track and has_request_context():
+            g.catalog_cache_key = key
+        return value
+
+    def get_encoded(self, key, encoding, digest):
+        """Encoded body stored for key, if it was built from a body with this digest."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            stored = entry[2].get(encoding)
+            return stored[1] if stored is not None and stored[0] == digest else None
+
+    def set_encoded(self, key, encoding, digest, body):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2][encoding] = (digest, body)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "generation": self.generation
+            }
+
+
+def cache_key(namespace, args=None):
+    """
+    Build a cache key from a namespace and request args, ignoring arg order.
+    """
+    if not args:
+        return (namespace,)
+    return (namespace,) + tuple(sorted((k, tuple(sorted(args.getlist(k)))) for k in args.keys()))
+
+
+def init_catalog_cache(app):
+    app.extensions["catalog_cache"] = CatalogCache(
+        max_entries=app.config.get("CATALOG_CACHE_MAX_ENTRIES", 512),
+        ttl=app.config.get("CATALOG_CACHE_TTL", 60)
+    )
+
+
+def get_catalog_cache():
+    return current_app.extensions["catalog_cache"]
+
+
+def catalog_version():
+    """
+    Fingerprint of the whole catalog: row count and latest updated_at of
+    products, categories and sub-categories, read in one query.
+
+    The fingerprint is cached like any other catalog read, so it is only
+    recomputed after a write (or once per TTL, which also bounds how long
+    another worker's writes can go unnoticed).
+    """
+    def load():
+        row = db.session.execute(select(*(
+            expr
+            for model in CATALOG_MODELS
+            for expr in (
+                select(func.count(model.id)).scalar_subquery(),
+                select(func.max(model.updated_at)).scalar_subquery()
+            )
+        ))).one()
+        return "|".join(str(value) for value in row)
+
+    return get_catalog_cache().get_or_load(cache_key("catalog:version"), load, track=False)
+
+
+def catalog_etag(request):
+    """Strong ETag for a catalog GET: catalog version + path + normalized args."""
+    raw = f"{catalog_version()}|{request.path}|{cache_key('', request.args)!r}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+@catalog_changed.connect
+def _invalidate_on_catalog_change(app, changes=None):
+    cache = app.extensions.get("catalog_cache")
+    if cache is not None:
+        cache.invalidate()
@@ -0,0 +1,81 @@
+from blinker import Namespace
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from server.app.models.product import Product
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+
+CATALOG_MODELS = (Product, Category, SubCategory)
+
+_signals = Namespace()
+
+# Sent with the app as sender after a transaction that wrote catalog rows
+# commits. `changes` is a list of CatalogChange, or None when the rows are
+# unknown (bulk UPDATE/DELETE/INSERT statements) and listeners should resync.
+catalog_changed = _signals.signal("catalog-changed")
+
+
+class CatalogChange:
+    __slots__ = ("kind", "id", "name", "description", "active", "deleted")
+
+    def __init__(self, kind, id, name=None, active=True, deleted=False, description=None):
+        self.kind = kind
+        self.id = id
+        self.name = name
+        self.description = description
+        self.active = active
+        self.deleted = deleted
+
+
+def _describe(obj, deleted=False):
+    if isinstance(obj, Product):
+        return CatalogChange("product", obj.id, obj.product_name, bool(obj.status), deleted, obj.description)
+    if isinstance(obj, Category):
+        return CatalogChange("category", obj.id, obj.category_name, True, deleted)
+    return CatalogChange("sub_category", obj.id, obj.sub_category_name, True, deleted)
+
+
+def record_catalog_changes(session, objs):
+    """
+    Queue changes for catalog rows written by a Core statement the flush
+    hooks cannot see, so listeners update just those rows instead of
+    resyncing the whole catalog.
+    """
+    pending = session.info.setdefault("catalog_changes", [])
+    if pending is not None:
+        pending.extend(_describe(obj) for obj in objs)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    changes = [_describe(obj) for obj in (*session.new, *session.dirty) if isinstance(obj, CATALOG_MODELS)]
+    changes += [_describe(obj, deleted=True) for obj in session.deleted if isinstance(obj, CATALOG_MODELS)]
+    if changes:
+        pending = session.info.setdefault("catalog_changes", [])
+        if pending is not None:
+            pending.extend(changes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_catalog_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, CATALOG_MODELS):
+        orm_execute_state.session.info["catalog_changes"] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_on_commit(session):
+    if "catalog_changes" not in session.info:
+        return
+    changes = session.info.pop("catalog_changes")
+    if has_app_context():
+        catalog_changed.send(current_app._get_current_object(), changes=changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("catalog_changes", None)
@@ -0,0 +1,51 @@
+from sqlalchemy import func
+
+from server.app.extensions import db
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+from server.app.models.product import Product
+
+
+def active_product_counts():
+    """{(category_id, sub_category_id): active product count} from one GROUP BY."""
+    rows = db.session.query(Product.category_id, Product.sub_category_id, func.count(Product.id))\
+        .filter(Product.status == True)\
+        .group_by(Product.category_id, Product.sub_category_id).all()
+    return {(category_id, sub_category_id): count for category_id, sub_category_id, count in rows}
+
+
+def build_category_tree(with_counts=False):
+    """
+    Every category with its sub-categories, read with a single outer join
+    (plus one grouped count query when with_counts is set).
+    """
+    rows = db.session.query(
+        Category.id, Category.category_name, SubCategory.id, SubCategory.sub_category_name
+    ).outerjoin(SubCategory, SubCategory.category_id == Category.id)\
+        .order_by(Category.created_at, Category.id, SubCategory.created_at, SubCategory.id).all()
+
+    counts = active_product_counts() if with_counts else None
+    category_totals = {}
+    for (category_id, _), count in (counts or {}).items():
+        category_totals[category_id] = category_totals.get(category_id, 0) + count
+
+    tree, nodes = [], {}
+    for category_id, category_name, sub_category_id, sub_category_name in rows:
+        node = nodes.get(category_id)
+        if node is None:
+            node = nodes[category_id] = {
+                "id": str(category_id),
+                "category_name": category_name,
+                "subcategories": []
+            }
+            if counts is not None:
+                node["product_count"] = category_totals.get(category_id, 0)
+            tree.append(node)
+        if sub_category_id is None:
+            continue
+        child = {"id": str(sub_category_id), "sub_category_name": sub_category_name}
+        if counts is not None:
+            child["product_count"] = counts.get((category_id, sub_category_id), 0)
+        node["subcategories"].append(child)
+
+    return tree
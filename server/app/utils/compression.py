@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+from flask import g, request
+
+from server.app.utils.catalog_cache import get_catalog_cache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DEFAULT_COMPRESS_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+)
+
+
+def choose_encoding(accept_encodings):
+    """The best encoding the client accepts: br (when available) or gzip, by q-value."""
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding, level):
+    if encoding == "br":
+        return brotli.compress(body, quality=min(level, 11))
+    # mtime=0 keeps the output byte-identical for identical bodies
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _compress_response(app, response):
+    config = app.config
+    if not config["COMPRESS_ENABLED"]:
+        return response
+    if response.status_code < 200 or response.status_code >= 300 or response.status_code in (204, 206):
+        return response
+    if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+        return response
+    if response.mimetype not in config["COMPRESS_MIMETYPES"]:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    # Bodies built from a catalog cache entry keep their compressed form on
+    # that entry; the digest guards against a view rendering it differently.
+    key = g.get("catalog_cache_key")
+    compressed = None
+    if key is not None:
+        digest = hashlib.sha1(body).digest()
+        compressed = get_catalog_cache().get_encoded(key, encoding, digest)
+    if compressed is None:
+        compressed = compress(body, encoding, config["COMPRESS_LEVEL"])
+        if key is not None:
+            get_catalog_cache().set_encoded(key, encoding, digest, compressed)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # Byte-for-byte different from the identity body
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    app.config.setdefault("COMPRESS_ENABLED", True)
+    app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    app.config.setdefault("COMPRESS_MIMETYPES", DEFAULT_COMPRESS_MIMETYPES)
+
+    @app.after_request
+    def compress_response(response):
+        return _compress_response(app, response)
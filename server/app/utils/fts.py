@@ -0,0 +1,113 @@
+import re
+from sqlalchemy import event, func, or_, and_, false, text, column, literal_column, Integer, Float
+
+from server.app.extensions import db
+from server.app.models.product import Product
+
+# SQLite: an external-content FTS5 table over products, kept in sync by triggers.
+# The index lives on products.rowid; VACUUM can renumber that, so run
+# `flask rebuild-search-index` after a VACUUM.
+SQLITE_FTS_DDL = [
+    "DROP TABLE IF EXISTS products_fts",
+    "CREATE VIRTUAL TABLE products_fts USING fts5("
+    "product_name, description, content='products', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, product_name, description) "
+    "VALUES (new.rowid, new.product_name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, product_name, description) "
+    "VALUES ('delete', old.rowid, old.product_name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF product_name, description ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, product_name, description) "
+    "VALUES ('delete', old.rowid, old.product_name, old.description); "
+    "INSERT INTO products_fts(rowid, product_name, description) "
+    "VALUES (new.rowid, new.product_name, new.description); END",
+]
+
+SQLITE_FTS_REBUILD = "INSERT INTO products_fts(products_fts) VALUES ('rebuild')"
+
+# Postgres: a GIN expression index; queries must use the exact same expression.
+PG_TSVECTOR_SQL = "to_tsvector('english', coalesce(products.product_name, '') || ' ' || coalesce(products.description, ''))"
+PG_FTS_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN ({PG_TSVECTOR_SQL})",
+]
+
+
+def _tokens(term):
+    return re.findall(r"\w+", (term or "").lower())
+
+
+def search_condition(term):
+    """
+    Filter expression matching products whose name or description contain
+    every word of term as a word prefix. Returns None for an empty term.
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = " AND ".join(f'"{t}"*' for t in tokens)
+        return text(
+            "products.rowid IN (SELECT rowid FROM products_fts WHERE products_fts MATCH :fts_query)"
+        ).bindparams(fts_query=match)
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("english", " & ".join(f"{t}:*" for t in tokens))
+        return literal_column(PG_TSVECTOR_SQL).op("@@")(tsquery)
+
+    conditions = [
+        or_(Product.product_name.ilike(f"%{t}%"), Product.description.ilike(f"%{t}%"))
+        for t in tokens
+    ]
+    return and_(*conditions)
+
+
+def ranked_search(query, term):
+    """
+    Apply a full-text match for term to a Product query and order the results
+    by relevance (best first). Name matches weigh more than description matches.
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return query.filter(false())
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = " AND ".join(f'"{t}"*' for t in tokens)
+        hits = text(
+            "SELECT rowid, bm25(products_fts, 10.0, 1.0) AS rank "
+            "FROM products_fts WHERE products_fts MATCH :fts_query"
+        ).bindparams(fts_query=match).columns(column("rowid", Integer), column("rank", Float)).subquery("fts_hits")
+        return query.join(hits, literal_column("products.rowid") == hits.c.rowid).order_by(hits.c.rank.asc())
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("english", " & ".join(f"{t}:*" for t in tokens))
+        weighted = func.setweight(func.to_tsvector("english", func.coalesce(Product.product_name, "")), "A")\
+            .op("||")(func.setweight(func.to_tsvector("english", func.coalesce(Product.description, "")), "D"))
+        return query.filter(literal_column(PG_TSVECTOR_SQL).op("@@")(tsquery))\
+            .order_by(func.ts_rank(weighted, tsquery).desc())
+
+    return query.filter(search_condition(term)).order_by(Product.product_name)
+
+
+def rebuild_search_index(connection):
+    """Recreate the full-text structures for the connection's dialect and reindex every product."""
+    if connection.dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(SQLITE_FTS_REBUILD)
+    elif connection.dialect.name == "postgresql":
+        for statement in PG_FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Product.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    rebuild_search_index(connection)
+
+
+@event.listens_for(Product.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS products_fts")
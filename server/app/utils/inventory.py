@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, MetaData, Table, case, exists, select, update
+
+from server.app.extensions import db
+from server.app.models.base import GUID
+from server.app.models.product import Product
+from server.app.utils.catalog_events import record_catalog_changes
+
+# Upper bound for one HTTP request; the CLI takes files of any size
+MAX_STOCK_ADJUSTMENTS = 50000
+
+# Per-transaction scratch table the batch is loaded into, so the stock change
+# itself is a single UPDATE joined against it.
+_adjustments = Table(
+    'stock_adjustments', MetaData(),
+    Column('product_id', GUID(), primary_key=True),
+    Column('quantity', Integer, nullable=False),
+    prefixes=['TEMPORARY']
+)
+
+
+def _to_int(value, field):
+    if isinstance(value, bool):
+        raise ValueError(f'{field} must be an integer')
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an integer')
+
+
+def parse_stock_adjustments(items):
+    """
+    Turn [{'product_id', 'delta'}] or [{'product_id', 'stock_qty'}] into
+    (mode, {UUID: quantity}), mode being 'delta' or 'set'. Repeated ids add
+    up in delta mode and the last one wins in set mode. Raises ValueError.
+    """
+    mode, quantities = None, {}
+    for index, item in enumerate(items, start=1):
+        if not isinstance(item, dict) or 'product_id' not in item:
+            raise ValueError(f'Adjustment {index}: product_id is required')
+        if item.get('delta') not in (None, ''):
+            item_mode = 'delta'
+        elif item.get('stock_qty') not in (None, ''):
+            item_mode = 'set'
+        else:
+            raise ValueError(f'Adjustment {index}: delta or stock_qty is required')
+        if mode is not None and item_mode != mode:
+            raise ValueError('A batch must use either delta or stock_qty, not both')
+        mode = item_mode
+
+        try:
+            product_id = uuid.UUID(str(item['product_id']).strip())
+        except ValueError:
+            raise ValueError(f"Adjustment {index}: invalid product_id '{item['product_id']}'")
+        if mode == 'delta':
+            quantities[product_id] = quantities.get(product_id, 0) + _to_int(item['delta'], 'delta')
+        else:
+            quantity = _to_int(item['stock_qty'], 'stock_qty')
+            if quantity < 0:
+                raise ValueError(f'Adjustment {index}: stock_qty must not be negative')
+            quantities[product_id] = quantity
+
+    return mode, quantities
+
+
+def apply_stock_adjustments(mode, quantities):
+    """
+    Apply a parsed batch in one transaction: bulk-load it into a temporary
+    table, then change every matching product with a single UPDATE. Deltas
+    that would take stock below zero are skipped and reported as rejected.
+    """
+    report = {'mode': mode, 'requested': len(quantities), 'updated': 0, 'unknown_ids': [], 'rejected_ids': []}
+    if not quantities:
+        return report
+
+    connection = db.session.connection()
+    # A failed batch can leave the table behind on SQLite, whose DDL is not
+    # rolled back with the session
+    _adjustments.drop(connection, checkfirst=True)
+    _adjustments.create(connection)
+
+    db.session.execute(_adjustments.insert(), [
+        {'product_id': product_id, 'quantity': quantity} for product_id, quantity in quantities.items()
+    ])
+
+    report['unknown_ids'] = [str(product_id) for product_id in db.session.scalars(
+        select(_adjustments.c.product_id).where(~exists().where(Product.id == _adjustments.c.product_id))
+    )]
+
+    quantity = select(_adjustments.c.quantity)\
+        .where(_adjustments.c.product_id == Product.id).scalar_subquery()
+    stmt = update(Product).where(Product.id.in_(select(_adjustments.c.product_id)))
+    if mode == 'delta':
+        report['rejected_ids'] = [str(product_id) for product_id in db.session.scalars(
+            select(_adjustments.c.product_id)
+            .join(Product, Product.id == _adjustments.c.product_id)
+            .where(Product.stock_qty + _adjustments.c.quantity < 0)
+        )]
+        stmt = stmt.where(Product.stock_qty + quantity >= 0).values(stock_qty=Product.stock_qty + quantity)
+    else:
+        stmt = stmt.values(stock_qty=quantity)
+
+    result = db.session.execute(stmt.execution_options(synchronize_session=False))
+    report['updated'] = result.rowcount
+    _adjustments.drop(connection)
+
+    return report
+
+
+def reserve_stock(quantities, products):
+    """
+    Take {product_id: quantity} out of stock with one conditional UPDATE
+    (stock_qty = stock_qty - q WHERE stock_qty >= q, per product). The guard
+    is checked as each row is written, so concurrent checkouts cannot
+    oversell. Returns False if any product fell short; some rows may then be
+    decremented already, so the caller must roll back.
+
+    products maps the ids to their loaded Product rows. The statement runs
+    on the Core table, and only those products are reported as changed, so
+    the search indexes update just those rows instead of rebuilding.
+    """
+    if not quantities:
+        return True
+    table = Product.__table__
+    needed = case({product_id: quantity for product_id, quantity in quantities.items()}, value=table.c.id)
+    result = db.session.execute(
+        update(table)
+        .where(table.c.id.in_(list(quantities)), table.c.stock_qty >= needed)
+        .values(stock_qty=table.c.stock_qty - needed, updated_at=datetime.now(timezone.utc))
+    )
+    if result.rowcount != len(quantities):
+        return False
+    record_catalog_changes(db.session, [products[product_id] for product_id in quantities])
+    return True
@@ -0,0 +1,87 @@
+import base64
+import json
+import uuid
+from sqlalchemy import select, or_, and_
+
+
+MAX_PER_PAGE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(row_id, direction="next"):
+    """
+    Encode an opaque cursor token pointing at a row.
+    """
+    payload = json.dumps({"id": uuid.UUID(str(row_id)).hex, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token into (row_id, direction).
+    Raises InvalidCursor if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload.get("d", "next")
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return uuid.UUID(payload["id"]), direction
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def keyset_paginate(query, model, cursor=None, per_page=10, descending=True):
+    """
+    Seek-based pagination over (model.created_at, model.id).
+
+    Instead of OFFSET, the anchor row's key is looked up by primary key and the
+    page continues strictly after (or before) it, so every page costs the same
+    no matter how deep it is. per_page is clamped to 1..MAX_PER_PAGE.
+    Returns (items, next_cursor, prev_cursor).
+    """
+    created_col, id_col = model.created_at, model.id
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+
+    direction = "next"
+    if cursor:
+        anchor_id, direction = decode_cursor(cursor)
+        # Compare against the stored key rather than a re-bound timestamp so the
+        # seek is exact regardless of how the dialect formats datetimes.
+        anchor_created = select(created_col).where(id_col == anchor_id).scalar_subquery()
+        forward = descending if direction == "next" else not descending
+        if forward:
+            query = query.filter(or_(
+                created_col < anchor_created,
+                and_(created_col == anchor_created, id_col < anchor_id)
+            ))
+        else:
+            query = query.filter(or_(
+                created_col > anchor_created,
+                and_(created_col == anchor_created, id_col > anchor_id)
+            ))
+
+    # Walking backwards means reading the index in the opposite order
+    scan_desc = descending if direction == "next" else not descending
+    if scan_desc:
+        query = query.order_by(None).order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(None).order_by(created_col.asc(), id_col.asc())
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+
+    if direction == "prev":
+        items.reverse()
+        next_cursor = encode_cursor(items[-1].id, "next") if items else None
+        prev_cursor = encode_cursor(items[0].id, "prev") if items and has_more else None
+    else:
+        next_cursor = encode_cursor(items[-1].id, "next") if items and has_more else None
+        prev_cursor = encode_cursor(items[0].id, "prev") if items and cursor else None
+
+    return items, next_cursor, prev_cursor
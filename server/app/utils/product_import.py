@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import uuid
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert
+
+from server.app.extensions import db
+from server.app.models.product import Product
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+
+IMPORT_CHUNK_SIZE = 1000
+# The report keeps every error count but only lists the first few rows
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(filename=None, content_type=None, explicit=None):
+    """Pick 'csv' or 'ndjson' from an explicit value, the file extension or the content type."""
+    if explicit:
+        explicit = explicit.lower()
+        if explicit in ('jsonl', 'json'):
+            explicit = 'ndjson'
+        if explicit not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format '{explicit}'")
+        return explicit
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in (content_type or '') or 'jsonl' in (content_type or ''):
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_rows(stream, fmt):
+    """
+    Lazily yield (row_number, dict) from a binary stream, one line at a time,
+    so an upload is never held in memory as a whole.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+        return
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+class CatalogLookup:
+    """Category and sub-category ids by id or (case-insensitive) name, loaded in two queries."""
+
+    def __init__(self):
+        self.categories = {}        # category id -> category id
+        self.category_names = {}    # lower(name) -> category id
+        self.sub_categories = {}    # sub-category id -> category id
+        self.sub_category_names = {}  # (category id, lower(name)) -> sub-category id
+        for category_id, name in db.session.query(Category.id, Category.category_name):
+            self.categories[category_id] = category_id
+            self.category_names.setdefault(name.strip().lower(), category_id)
+        for sub_category_id, category_id, name in db.session.query(
+                SubCategory.id, SubCategory.category_id, SubCategory.sub_category_name):
+            self.sub_categories[sub_category_id] = category_id
+            self.sub_category_names.setdefault((category_id, name.strip().lower()), sub_category_id)
+
+    def resolve(self, row):
+        """Return (category_id, sub_category_id) for a row, or raise ValueError."""
+        if row.get('category_id'):
+            category_id = uuid.UUID(str(row['category_id']).strip())
+            if category_id not in self.categories:
+                raise ValueError(f"Unknown category_id '{row['category_id']}'")
+        elif row.get('category_name'):
+            category_id = self.category_names.get(str(row['category_name']).strip().lower())
+            if category_id is None:
+                raise ValueError(f"Unknown category '{row['category_name']}'")
+        else:
+            raise ValueError('category_name or category_id is required')
+
+        if row.get('sub_category_id'):
+            sub_category_id = uuid.UUID(str(row['sub_category_id']).strip())
+            if self.sub_categories.get(sub_category_id) != category_id:
+                raise ValueError(f"Unknown sub_category_id '{row['sub_category_id']}' for this category")
+        elif row.get('sub_category_name'):
+            sub_category_id = self.sub_category_names.get(
+                (category_id, str(row['sub_category_name']).strip().lower()))
+            if sub_category_id is None:
+                raise ValueError(f"Unknown sub-category '{row['sub_category_name']}' for this category")
+        else:
+            raise ValueError('sub_category_name or sub_category_id is required')
+
+        return category_id, sub_category_id
+
+
+def _to_product_values(row, lookup):
+    name = str(row.get('product_name') or '').strip()
+    if not name:
+        raise ValueError('product_name is required')
+
+    try:
+        price = Decimal(str(row.get('price')).strip())
+    except (InvalidOperation, AttributeError):
+        raise ValueError('price must be a number')
+    if not price.is_finite() or price < 0:
+        raise ValueError('price must be a non-negative number')
+
+    try:
+        stock_qty = int(str(row.get('stock_qty')).strip())
+    except ValueError:
+        raise ValueError('stock_qty must be an integer')
+    if stock_qty < 0:
+        raise ValueError('stock_qty must not be negative')
+
+    category_id, sub_category_id = lookup.resolve(row)
+    status = row.get('status', True)
+    if isinstance(status, str):
+        status = status.strip().lower() not in ('0', 'false', 'no', '')
+
+    return {
+        'product_name': name,
+        'description': row.get('description') or None,
+        'price': price,
+        'stock_qty': stock_qty,
+        'image_url': row.get('image_url') or None,
+        'category_id': category_id,
+        'sub_category_id': sub_category_id,
+        'status': bool(status),
+    }
+
+
+def import_products(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Validate and insert (row_number, dict) pairs in chunks of chunk_size.
+
+    Each chunk is one multi-row INSERT committed on its own, so a bad chunk
+    only loses its own rows. Returns a report of counts and per-row errors.
+    """
+    lookup = CatalogLookup()
+    report = {'processed': 0, 'imported': 0, 'failed': 0, 'errors': []}
+
+    def record_error(number, message):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': number, 'error': message})
+
+    def flush(chunk):
+        try:
+            db.session.execute(insert(Product), [values for _, values in chunk])
+            db.session.commit()
+            report['imported'] += len(chunk)
+        except Exception as e:
+            db.session.rollback()
+            for number, _ in chunk:
+                record_error(number, f'Insert failed: {e}')
+
+    chunk = []
+    for number, row in rows:
+        report['processed'] += 1
+        if row is None:
+            record_error(number, 'Malformed row')
+            continue
+        try:
+            chunk.append((number, _to_product_values(row, lookup)))
+        except ValueError as e:
+            record_error(number, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    return report
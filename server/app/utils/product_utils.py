@@ -0,0 +1,73 @@
+import uuid
+from sqlalchemy import case, func
+from server.app.models.product import Product
+
+MAX_BATCH_IDS = 100
+
+# Lower bounds of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKETS = [0, 500, 1000, 2500, 5000, 10000]
+
+
+def parse_product_ids(raw_ids):
+    """
+    Turn product ids (strings or UUIDs) into a de-duplicated list of UUIDs,
+    keeping the caller's order. Raises ValueError on a malformed id.
+    """
+    seen = {}
+    for raw in raw_ids:
+        product_uuid = raw if isinstance(raw, uuid.UUID) else uuid.UUID(str(raw).strip())
+        seen.setdefault(product_uuid, None)
+    return list(seen)
+
+
+def load_products(product_ids):
+    """
+    Fetch many products with a single IN (...) query.
+    Returns a dict of {UUID: Product}; ids that do not exist are simply absent.
+    """
+    product_ids = parse_product_ids(product_ids)
+    if not product_ids:
+        return {}
+    products = Product.query.filter(Product.id.in_(product_ids)).all()
+    return {product.id: product for product in products}
+
+
+def product_facets(query):
+    """
+    Per-category, per-sub-category and price-bucket counts for a filtered
+    Product query, computed with a single GROUP BY and rolled up in Python.
+    """
+    bucket = case(
+        *[(Product.price >= lower, index) for index, lower in reversed(list(enumerate(PRICE_BUCKETS)))],
+        else_=0
+    ).label('price_bucket')
+
+    rows = query.order_by(None).with_entities(
+        Product.category_id, Product.sub_category_id, bucket, func.count(Product.id)
+    ).group_by(Product.category_id, Product.sub_category_id, bucket).all()
+
+    categories, sub_categories, prices = {}, {}, [0] * len(PRICE_BUCKETS)
+    for category_id, sub_category_id, price_bucket, count in rows:
+        categories[category_id] = categories.get(category_id, 0) + count
+        key = (sub_category_id, category_id)
+        sub_categories[key] = sub_categories.get(key, 0) + count
+        prices[price_bucket] += count
+
+    return {
+        'categories': [
+            {'id': str(category_id), 'count': count}
+            for category_id, count in sorted(categories.items(), key=lambda item: -item[1])
+        ],
+        'sub_categories': [
+            {'id': str(sub_category_id), 'category_id': str(category_id), 'count': count}
+            for (sub_category_id, category_id), count in sorted(sub_categories.items(), key=lambda item: -item[1])
+        ],
+        'price': [
+            {
+                'min': lower,
+                'max': PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None,
+                'count': prices[index]
+            }
+            for index, lower in enumerate(PRICE_BUCKETS)
+        ]
+    }
@@ -0,0 +1,259 @@
+"""
+Read-only list serializers that skip ORM hydration.
+
+List endpoints select just the columns they render, as plain row tuples,
+and turn them into dicts in one pass. GUID columns are read as their raw
+text (hex on SQLite, dashed on Postgres) and formatted directly instead of
+going through uuid.UUID, and Numeric columns skip Decimal. Every serializer returns exactly what the model's
+to_dict() would, or the subset named in a ``fields=`` query parameter.
+"""
+from sqlalchemy import Float, String, type_coerce
+
+from server.app.extensions import db
+from server.app.models.product import Product
+from server.app.models.orders import Order
+from server.app.models.order_items import OrderItem
+from server.app.models.carts import Cart
+from server.app.models.users import User
+
+
+def raw_guid(column):
+    """Select a GUID column without the per-row UUID conversion."""
+    return type_coerce(column, String).label(column.key)
+
+
+def raw_number(column):
+    """Select a Numeric column as the driver returns it, skipping the Decimal round trip."""
+    return type_coerce(column, Float).label(column.key)
+
+
+def money(value):
+    """float() of a raw Numeric(10, 2) value, rounded the way the Decimal path would be."""
+    return round(float(value), 2)
+
+
+def isoformat(value):
+    return value.isoformat()
+
+
+def enum_name(value):
+    return value.name
+
+
+def parse_fields(raw, available):
+    """
+    Turn a comma separated ``fields=`` value into the requested field names, in
+    the canonical order of available. None (no parameter) means every field.
+    Raises ValueError naming any unknown field.
+    """
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    return [name for name in available if name in requested]
+
+
+class FieldSet:
+    """
+    The columns to SELECT for a set of output fields, and how to render them.
+
+    spec maps field name -> (column, formatter or None). The key column is
+    always selected first (pagination and joins need it) even when it is not
+    one of the rendered fields.
+    """
+
+    def __init__(self, spec, names, key="id"):
+        selected = [key] + [name for name in names if name != key]
+        position = {name: index for index, name in enumerate(selected)}
+        self.names = list(names)
+        self.columns = tuple(spec[name][0] for name in selected)
+        self._fields = [(name, position[name], spec[name][1]) for name in names]
+
+    def to_dict(self, row):
+        return {
+            name: value if formatter is None or value is None else formatter(value)
+            for name, index, formatter in self._fields
+            for value in (row[index],)
+        }
+
+
+def guid_str(value):
+    """Format a raw GUID value the way str(uuid.UUID) does."""
+    if value is None:
+        return None
+    value = str(value)
+    if len(value) == 32:
+        return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+    return value
+
+
+PRODUCT_FIELDS = {
+    'id': (raw_guid(Product.id), guid_str),
+    'product_name': (Product.product_name, None),
+    'description': (Product.description, None),
+    'price': (raw_number(Product.price), money),
+    'stock_qty': (Product.stock_qty, None),
+    'image_url': (Product.image_url, None),
+    'category_id': (raw_guid(Product.category_id), guid_str),
+    'sub_category_id': (raw_guid(Product.sub_category_id), guid_str),
+    'status': (Product.status, None),
+    'created_at': (Product.created_at, isoformat),
+}
+
+
+class ProductRow:
+    """A product list row: the columns Product.to_dict() renders, nothing else."""
+
+    __slots__ = ("id", "product_name", "description", "price", "stock_qty", "image_url",
+                 "category_id", "sub_category_id", "status", "created_at")
+
+    columns = tuple(column for column, _ in PRODUCT_FIELDS.values())
+
+    def __init__(self, row):
+        (self.id, self.product_name, self.description, self.price, self.stock_qty, self.image_url,
+         self.category_id, self.sub_category_id, self.status, self.created_at) = row
+
+    def to_dict(self):
+        return {
+            'id': guid_str(self.id),
+            'product_name': self.product_name,
+            'description': self.description,
+            'price': money(self.price),
+            'stock_qty': self.stock_qty,
+            'image_url': self.image_url,
+            'category_id': guid_str(self.category_id),
+            'sub_category_id': guid_str(self.sub_category_id),
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+def product_fieldset(raw_fields=None):
+    """FieldSet for a products ``fields=`` value; None (full rows) when it is absent."""
+    names = parse_fields(raw_fields, PRODUCT_FIELDS)
+    return None if names is None else FieldSet(PRODUCT_FIELDS, names)
+
+
+def project_products(query, fieldset=None):
+    """Turn a Product query into a column-only query for ProductRow or the given fieldset."""
+    return query.with_entities(*(fieldset.columns if fieldset else ProductRow.columns))
+
+
+def product_row_serializer(fieldset=None):
+    """row -> dict for rows from project_products(query, fieldset)."""
+    if fieldset is None:
+        return lambda row: ProductRow(row).to_dict()
+    return fieldset.to_dict
+
+
+def serialize_products(rows, fieldset=None):
+    if fieldset is None:
+        return [ProductRow(row).to_dict() for row in rows]
+    return [fieldset.to_dict(row) for row in rows]
+
+
+ORDER_SCALAR_FIELDS = {
+    'id': (raw_guid(Order.id), guid_str),
+    'cart_id': (raw_guid(Order.cart_id), guid_str),
+    'status': (Order.status, enum_name),
+    'total_amount': (raw_number(Order.total_amount), money),
+    'created_at': (Order.created_at, isoformat),
+}
+ORDER_FIELDS = (*ORDER_SCALAR_FIELDS, 'customer', 'items')
+
+ORDER_CUSTOMER_COLUMNS = (
+    User.id.label('user_id'), User.first_name, User.last_name,
+    User.primary_phone_no, User.username, User.email,
+)
+
+
+def project_orders(query, fields=None, join_customer=False):
+    """
+    Column-only version of an Order query for the given order fields (all of
+    them by default). Cart and user are outer-joined only when the customer
+    block is wanted or join_customer is set (e.g. to filter on user columns);
+    the query must not already join Cart or User.
+    """
+    names = fields or ORDER_FIELDS
+    fieldset = FieldSet(ORDER_SCALAR_FIELDS, [name for name in names if name in ORDER_SCALAR_FIELDS])
+    columns = fieldset.columns
+    if 'customer' in names:
+        columns += ORDER_CUSTOMER_COLUMNS
+    if 'customer' in names or join_customer:
+        query = query.outerjoin(Cart, Order.cart_id == Cart.id)\
+            .outerjoin(User, Cart.user_id == User.id)
+    return query.with_entities(*columns)
+
+
+def order_items_by_order(order_ids):
+    """Serialized items for many orders in one query: {raw order id: [item dict]}."""
+    if not order_ids:
+        return {}
+    rows = db.session.query(
+        raw_guid(OrderItem.order_id), raw_guid(OrderItem.product_id), OrderItem.quantity,
+        raw_number(OrderItem.price), raw_number(OrderItem.sub_total), raw_guid(Product.id), Product.product_name,
+        Product.image_url
+    ).outerjoin(Product, OrderItem.product_id == Product.id)\
+        .filter(OrderItem.order_id.in_(order_ids)).all()
+
+    items = {}
+    for order_id, product_id, quantity, price, sub_total, joined_id, name, image_url in rows:
+        items.setdefault(order_id, []).append({
+            "product_id": guid_str(product_id),
+            "quantity": quantity,
+            "price": money(price),
+            "sub_total": money(sub_total) if sub_total else None,
+            "product": {
+                "id": guid_str(joined_id),
+                "name": name,
+                "image_url": image_url
+            } if joined_id is not None else None
+        })
+    return items
+
+
+def serialize_orders(rows, fields=None):
+    """Order.to_dict(include_items=True), cut down to fields, for rows from project_orders()."""
+    names = fields or ORDER_FIELDS
+    fieldset = FieldSet(ORDER_SCALAR_FIELDS, [name for name in names if name in ORDER_SCALAR_FIELDS])
+    customer_at = len(fieldset.columns)
+    items = order_items_by_order([row[0] for row in rows]) if 'items' in names else {}
+
+    orders = []
+    for row in rows:
+        data = fieldset.to_dict(row)
+        if 'customer' in names and row[customer_at] is not None:
+            first_name, last_name, phone, username, email = row[customer_at + 1:customer_at + 6]
+            data["customer"] = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "primary_phone_no": phone,
+                "username": username,
+                "email": email,
+            }
+        if 'items' in names:
+            data["items"] = items.get(row[0], [])
+        orders.append(data)
+    return orders
+
+
+USER_FIELDS = {
+    'id': (raw_guid(User.id), guid_str),
+    'first_name': (User.first_name, None),
+    'last_name': (User.last_name, None),
+    'username': (User.username, None),
+    'email': (User.email, None),
+    'primary_phone_no': (User.primary_phone_no, None),
+    'secondary_phone_no': (User.secondary_phone_no, None),
+    'role': (User.role, enum_name),
+    'is_active': (User.is_active, None),
+}
+
+
+def user_fieldset(raw_fields=None):
+    """FieldSet for an admin users ``fields=`` value; every User.to_dict() field by default."""
+    return FieldSet(USER_FIELDS, parse_fields(raw_fields, USER_FIELDS) or list(USER_FIELDS))
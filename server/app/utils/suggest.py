@@ -0,0 +1,133 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from flask import current_app
+
+from server.app.extensions import db
+from server.app.models.product import Product
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+from server.app.utils.catalog_events import catalog_changed
+
+# How many index slots a lookup may walk before ranking; keeps one-letter
+# prefixes from scanning the whole catalog.
+SCAN_LIMIT = 200
+
+
+def _normalize(text):
+    return " ".join(re.findall(r"\w+", (text or "").lower()))
+
+
+class PrefixIndex:
+    """
+    In-memory autocomplete index over product, category and sub-category names.
+
+    Every word start of a name is stored as a key in one sorted list, so
+    "lip" completes "Ruby Red Lipstick" as well as "Lip Liner". A lookup is a
+    bisect into that list plus a short forward scan; no database access.
+    """
+
+    def __init__(self):
+        self._keys = []          # sorted (key, kind, id)
+        self._names = {}         # (kind, id) -> (display name, [keys])
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def _keys_for(kind, id, name):
+        words = _normalize(name).split()
+        return [(" ".join(words[i:]), kind, id) for i in range(len(words))]
+
+    def add(self, kind, id, name):
+        with self._lock:
+            self.remove(kind, id)
+            keys = self._keys_for(kind, id, name)
+            for key in keys:
+                insort(self._keys, key)
+            self._names[(kind, id)] = (name, keys)
+
+    def remove(self, kind, id):
+        with self._lock:
+            entry = self._names.pop((kind, id), None)
+            if entry is None:
+                return
+            for key in entry[1]:
+                pos = bisect_left(self._keys, key)
+                if pos < len(self._keys) and self._keys[pos] == key:
+                    del self._keys[pos]
+
+    def suggest(self, prefix, limit=10):
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            start = bisect_left(self._keys, (prefix,))
+            candidates = {}
+            for key, kind, id in self._keys[start:start + SCAN_LIMIT]:
+                if not key.startswith(prefix):
+                    break
+                name, keys = self._names[(kind, id)]
+                # Names that start with the prefix beat mid-name word matches
+                rank = (0 if keys[0][0].startswith(prefix) else 1, len(name), name.lower())
+                if (kind, id) not in candidates or rank < candidates[(kind, id)][0]:
+                    candidates[(kind, id)] = (rank, name)
+
+        ranked = sorted(candidates.items(), key=lambda item: item[1][0])[:limit]
+        return [{"type": kind, "id": str(id), "name": name} for (kind, id), (_, name) in ranked]
+
+    def rebuild(self, rows):
+        keys, names = [], {}
+        for kind, id, name in rows:
+            entry_keys = self._keys_for(kind, id, name)
+            keys.extend(entry_keys)
+            names[(kind, id)] = (name, entry_keys)
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._names = names
+            self.built_at = time.monotonic()
+
+
+def _load_rows():
+    rows = [("product", id, name) for id, name in
+            db.session.query(Product.id, Product.product_name).filter(Product.status == True)]
+    rows += [("category", id, name) for id, name in db.session.query(Category.id, Category.category_name)]
+    rows += [("sub_category", id, name) for id, name in
+             db.session.query(SubCategory.id, SubCategory.sub_category_name)]
+    return rows
+
+
+def init_suggest_index(app):
+    app.extensions["suggest_index"] = PrefixIndex()
+
+
+def get_suggest_index():
+    """
+    Return the app's prefix index, building it on first use and again once it
+    is older than SUGGEST_INDEX_TTL (so writes made by other workers show up).
+    """
+    index = current_app.extensions["suggest_index"]
+    ttl = current_app.config.get("SUGGEST_INDEX_TTL", 300)
+    if index.built_at is None or time.monotonic() - index.built_at > ttl:
+        index.rebuild(_load_rows())
+    return index
+
+
+@catalog_changed.connect
+def _apply_catalog_changes(app, changes=None):
+    index = app.extensions.get("suggest_index")
+    if index is None or index.built_at is None:
+        return
+    if changes is None:
+        # Bulk write: rows unknown, rebuild on the next lookup
+        index.built_at = None
+        return
+    for change in changes:
+        if change.deleted or not change.active:
+            index.remove(change.kind, change.id)
+        else:
+            index.add(change.kind, change.id, change.name)
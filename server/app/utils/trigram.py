@@ -0,0 +1,216 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import event, func, literal, or_
+
+from server.app.extensions import db
+from server.app.models.product import Product
+from server.app.utils.catalog_events import catalog_changed
+
+# Same default cut-off as pg_trgm's similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+DESCRIPTION_WEIGHT = 0.5
+
+PG_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING GIN (product_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_description_trgm ON products USING GIN (description gin_trgm_ops)",
+]
+
+
+def _words(text):
+    # SKU-style numbers are never misspelt, so keep them out of the vocabulary
+    return {w for w in re.findall(r"\w{3,}", (text or "").lower()) if not w.isdigit()}
+
+
+def trigrams(word):
+    """pg_trgm-style trigrams: the word padded with two spaces in front and one behind."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-process fuzzy index for product names and descriptions.
+
+    Trigrams point at vocabulary words and words point at products, so a
+    misspelt query word is first matched against the (small) vocabulary by
+    trigram similarity, and only the products holding the close words are
+    scored. Name hits count fully, description hits at DESCRIPTION_WEIGHT.
+    """
+
+    def __init__(self):
+        self._word_trigrams = {}                     # word -> trigram set
+        self._trigram_words = defaultdict(set)       # trigram -> words
+        self._name_postings = defaultdict(set)       # word -> product ids
+        self._desc_postings = defaultdict(set)       # word -> product ids
+        self._products = {}                          # product id -> (name words, description words)
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._products)
+
+    def _add_word(self, word):
+        if word not in self._word_trigrams:
+            grams = trigrams(word)
+            self._word_trigrams[word] = grams
+            for gram in grams:
+                self._trigram_words[gram].add(word)
+
+    def _drop_word_if_unused(self, word):
+        if word in self._name_postings or word in self._desc_postings:
+            return
+        for gram in self._word_trigrams.pop(word, ()):
+            words = self._trigram_words[gram]
+            words.discard(word)
+            if not words:
+                del self._trigram_words[gram]
+
+    def add(self, product_id, name, description=None):
+        with self._lock:
+            self.remove(product_id)
+            name_words, desc_words = _words(name), _words(description)
+            for word in name_words:
+                self._add_word(word)
+                self._name_postings[word].add(product_id)
+            for word in desc_words:
+                self._add_word(word)
+                self._desc_postings[word].add(product_id)
+            self._products[product_id] = (name_words, desc_words)
+
+    def remove(self, product_id):
+        with self._lock:
+            entry = self._products.pop(product_id, None)
+            if entry is None:
+                return
+            for postings, words in ((self._name_postings, entry[0]), (self._desc_postings, entry[1])):
+                for word in words:
+                    ids = postings.get(word)
+                    if ids is not None:
+                        ids.discard(product_id)
+                        if not ids:
+                            del postings[word]
+            for word in entry[0] | entry[1]:
+                self._drop_word_if_unused(word)
+
+    def similar_words(self, word, threshold=SIMILARITY_THRESHOLD):
+        """Vocabulary words whose trigram similarity to word is >= threshold."""
+        grams = trigrams(word)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigram_words.get(gram, ()):
+                shared[candidate] += 1
+        matches = {}
+        for candidate, common in shared.items():
+            score = common / (len(grams) + len(self._word_trigrams[candidate]) - common)
+            if score >= threshold:
+                matches[candidate] = score
+        return matches
+
+    def search(self, term, limit=20, threshold=SIMILARITY_THRESHOLD):
+        """Return [(product_id, score)] best first; every query word must match something."""
+        query_words = _words(term)
+        if not query_words:
+            return []
+        with self._lock:
+            totals = None
+            for word in query_words:
+                best = {}
+                for candidate, score in self.similar_words(word, threshold).items():
+                    for product_id in self._name_postings.get(candidate, ()):
+                        best[product_id] = max(best.get(product_id, 0), score)
+                    for product_id in self._desc_postings.get(candidate, ()):
+                        best[product_id] = max(best.get(product_id, 0), score * DESCRIPTION_WEIGHT)
+                if totals is None:
+                    totals = best
+                else:
+                    totals = {pid: totals[pid] + score for pid, score in best.items() if pid in totals}
+                if not totals:
+                    return []
+
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(product_id, score / len(query_words)) for product_id, score in ranked]
+
+    def rebuild(self, rows):
+        fresh = TrigramIndex()
+        for product_id, name, description in rows:
+            fresh.add(product_id, name, description)
+        with self._lock:
+            self._word_trigrams = fresh._word_trigrams
+            self._trigram_words = fresh._trigram_words
+            self._name_postings = fresh._name_postings
+            self._desc_postings = fresh._desc_postings
+            self._products = fresh._products
+            self.built_at = time.monotonic()
+
+
+def init_trigram_index(app):
+    app.extensions["trigram_index"] = TrigramIndex()
+
+
+def get_trigram_index():
+    """
+    Return the app's trigram index, building it on first use and again once it
+    is older than TRIGRAM_INDEX_TTL (so writes made by other workers show up).
+    """
+    index = current_app.extensions["trigram_index"]
+    ttl = current_app.config.get("TRIGRAM_INDEX_TTL", 300)
+    if index.built_at is None or time.monotonic() - index.built_at > ttl:
+        rows = db.session.query(Product.id, Product.product_name, Product.description)\
+            .filter(Product.status == True).all()
+        index.rebuild(rows)
+    return index
+
+
+def fuzzy_search(query, term, limit=20, exclude_ids=()):
+    """
+    Typo-tolerant product search, best match first. Uses pg_trgm on Postgres
+    and the in-process TrigramIndex elsewhere. Returns a list of Products.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        score = func.greatest(
+            func.word_similarity(term, Product.product_name),
+            func.word_similarity(term, func.coalesce(Product.description, "")) * DESCRIPTION_WEIGHT
+        )
+        query = query.filter(or_(
+            literal(term).op("<%")(Product.product_name),
+            literal(term).op("<%")(Product.description)
+        ))
+        if exclude_ids:
+            query = query.filter(Product.id.notin_(list(exclude_ids)))
+        return query.order_by(score.desc()).limit(limit).all()
+
+    excluded = set(exclude_ids)
+    hits = [(pid, score) for pid, score in get_trigram_index().search(term, limit + len(excluded))
+            if pid not in excluded][:limit]
+    if not hits:
+        return []
+    products = {p.id: p for p in query.filter(Product.id.in_([pid for pid, _ in hits])).all()}
+    return [products[pid] for pid, _ in hits if pid in products]
+
+
+@catalog_changed.connect
+def _apply_catalog_changes(app, changes=None):
+    index = app.extensions.get("trigram_index")
+    if index is None or index.built_at is None:
+        return
+    if changes is None:
+        index.built_at = None
+        return
+    for change in changes:
+        if change.kind != "product":
+            continue
+        if change.deleted or not change.active:
+            index.remove(change.id)
+        else:
+            index.add(change.id, change.name, change.description)
+
+
+@event.listens_for(Product.__table__, "after_create")
+def _create_trigram_indexes(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        for statement in PG_TRGM_DDL:
+            connection.exec_driver_sql(statement)
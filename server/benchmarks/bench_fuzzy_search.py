@@ -0,0 +1,89 @@
+"""
+Fuzzy search latency against a synthetic 100k-product catalog.
+
+    python server/benchmarks/bench_fuzzy_search.py [--products 100000] [--queries 500]
+
+Builds the in-process TrigramIndex (the SQLite path of /api/search fuzzy
+fallback) and times misspelt brand/product queries. No database needed.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from server.app.utils.trigram import TrigramIndex
+
+BRANDS = ["Maybelline", "Neutrogena", "Revlon", "L'Oreal", "Garnier", "Nivea", "Clinique", "Fenty",
+          "Cerave", "Olay", "Bioderma", "Rimmel", "Essence", "Sephora", "Dove", "Aveeno", "Lancome",
+          "Estee Lauder", "Huda Beauty", "Black Opal"]
+PRODUCTS = ["Lipstick", "Mascara", "Foundation", "Concealer", "Moisturizer", "Cleanser", "Serum", "Toner",
+            "Eyeliner", "Blush", "Highlighter", "Primer", "Sunscreen", "Shampoo", "Conditioner", "Perfume",
+            "Lip Gloss", "Face Mask", "Body Lotion", "Setting Spray"]
+SHADES = ["Ruby", "Nude", "Coral", "Ivory", "Mocha", "Rose", "Berry", "Honey", "Velvet", "Matte",
+          "Glow", "Hydra", "Ultra", "Sheer", "Radiant", "Classic"]
+DESCRIPTIONS = ["Long lasting formula for all skin types", "Dermatologist tested and fragrance free",
+                "Lightweight texture with a natural finish", "Enriched with vitamin E and shea butter",
+                "Waterproof wear that lasts all day", "Gentle daily care for sensitive skin"]
+
+
+def misspell(word, rng):
+    """One random edit: drop, double, swap or replace a letter."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(2, len(word) - 1)
+    edit = rng.choice(["drop", "double", "swap", "replace"])
+    if edit == "drop":
+        return word[:i] + word[i + 1:]
+    if edit == "double":
+        return word[:i] + word[i] + word[i:]
+    if edit == "swap":
+        return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return word[:i] + rng.choice("aeiou") + word[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=8)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    rows = [
+        (uuid.uuid4(),
+         f"{rng.choice(BRANDS)} {rng.choice(SHADES)} {rng.choice(PRODUCTS)} {i}",
+         rng.choice(DESCRIPTIONS))
+        for i in range(args.products)
+    ]
+
+    index = TrigramIndex()
+    started = time.perf_counter()
+    index.rebuild(rows)
+    build_s = time.perf_counter() - started
+
+    queries = [misspell(rng.choice(BRANDS).split()[0], rng) for _ in range(args.queries // 2)]
+    queries += [f"{misspell(rng.choice(BRANDS).split()[0], rng)} {misspell(rng.choice(PRODUCTS).split()[0], rng)}"
+                for _ in range(args.queries - len(queries))]
+
+    timings, found = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, limit=20)
+        timings.append((time.perf_counter() - started) * 1000)
+        found += bool(hits)
+
+    timings.sort()
+    pct = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))]
+    print(f"catalog: {args.products} products, vocabulary {len(index._word_trigrams)} words")
+    print(f"index build: {build_s:.2f}s")
+    print(f"queries: {len(queries)} misspelt, {found} returned results")
+    print(f"latency ms: p50 {pct(0.50):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  mean {statistics.mean(timings):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+JSON encoding: Flask's stdlib provider versus the orjson provider.
+
+    python server/benchmarks/bench_json.py [--orders 2000] [--repeat 9]
+
+Times (1) encoding an admin-order-list shaped payload with each provider and
+(2) full GET /api/orders/?per_page=N requests through the test client against
+a throwaway SQLite database, with JSON_PROVIDER set to each backend.
+Reports the median.
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def order_payload(count):
+    now = datetime.datetime.now()
+    return {
+        "orders": [{
+            "id": uuid.uuid4(),
+            "cart_id": uuid.uuid4(),
+            "status": "paid",
+            "total_amount": Decimal("129.90"),
+            "created_at": now,
+            "customer": {"first_name": "Jane", "last_name": "Doe", "primary_phone_no": "0712345678",
+                         "username": f"jane{i}", "email": f"jane{i}@example.com"},
+            "items": [{"product_id": uuid.uuid4(), "quantity": 2, "price": Decimal("43.30"),
+                       "sub_total": Decimal("86.60"),
+                       "product": {"id": uuid.uuid4(), "name": "Velvet Matte Lipstick",
+                                   "image_url": "https://img.example/lipstick.png"}}
+                      for _ in range(3)]
+        } for i in range(count)],
+        "total": count, "page": 1, "pages": 1, "per_page": count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+    from sqlalchemy import insert
+    from server.app import create_app
+    from server.app.extensions import db
+    from server.app.models.carts import Cart
+    from server.app.models.orders import Order
+    from server.app.models.users import User
+    from server.app.models.category import Category
+    from server.app.models.sub_category import SubCategory
+    from server.app.models.product import Product
+    from server.app.models.order_items import OrderItem
+    from server.app.utils.json_provider import OrjsonProvider, StdlibJSONProvider
+
+    app = create_app()
+    payload = order_payload(args.orders)
+    stdlib, fast = StdlibJSONProvider(app), OrjsonProvider(app)
+
+    print(f"{args.orders} orders, median of {args.repeat}")
+    slow_time = timed(lambda: stdlib.dumps(payload), args.repeat)
+    fast_time = timed(lambda: fast.dumps(payload), args.repeat)
+    print(f"  encode only       stdlib {slow_time * 1000:7.1f} ms   orjson {fast_time * 1000:7.1f} ms"
+          f"   x{slow_time / fast_time:.1f}")
+
+    with app.app_context():
+        db.create_all()
+        user = User(first_name="Jane", last_name="Doe", username="jane", email="jane@example.com",
+                    primary_phone_no="0712345678", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        cart = Cart(user_id=user.id)
+        db.session.add(cart)
+        db.session.flush()
+        category = Category(category_name="Bench")
+        db.session.add(category)
+        db.session.flush()
+        sub_category = SubCategory(sub_category_name="Bench Sub", category_id=category.id)
+        db.session.add(sub_category)
+        db.session.flush()
+        products = [Product(product_name=f"Velvet Matte Lipstick {i}", price=43.3, stock_qty=10,
+                            image_url="https://img.example/lipstick.png",
+                            category_id=category.id, sub_category_id=sub_category.id) for i in range(3)]
+        db.session.add_all(products)
+        db.session.execute(insert(Order), [{"cart_id": cart.id, "total_amount": 129.9} for _ in range(args.orders)])
+        db.session.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": product.id, "quantity": 2, "price": 43.3, "sub_total": 86.6}
+            for order_id in db.session.scalars(db.select(Order.id)) for product in products
+        ])
+        db.session.commit()
+
+    url = f"/api/orders/?per_page={args.orders}"
+    results = {}
+    for name, provider_class in (("stdlib", StdlibJSONProvider), ("orjson", OrjsonProvider)):
+        app.json = provider_class(app)
+        client = app.test_client()
+        client.get(url)
+        results[name] = timed(lambda: client.get(url), args.repeat)
+    print(f"  GET /api/orders/  stdlib {results['stdlib'] * 1000:7.1f} ms   orjson {results['orjson'] * 1000:7.1f} ms"
+          f"   x{results['stdlib'] / results['orjson']:.1f}")
+
+    with app.app_context():
+        db.session.remove()
+    os.unlink(db_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+List serialization: ORM to_dict() versus column projection, 10k rows.
+
+    python server/benchmarks/bench_serializers.py [--rows 10000] [--repeat 7]
+
+Seeds a throwaway SQLite database with products and orders (two items each),
+then times loading and serializing every row both ways. Reports the median.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+    from sqlalchemy import insert
+    from sqlalchemy.orm import joinedload
+    from server.app import create_app
+    from server.app.extensions import db
+    from server.app.models.product import Product
+    from server.app.models.category import Category
+    from server.app.models.sub_category import SubCategory
+    from server.app.models.carts import Cart
+    from server.app.models.orders import Order
+    from server.app.models.order_items import OrderItem
+    from server.app.utils.projections import (
+        project_products, serialize_products, project_orders, serialize_orders
+    )
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        category = Category(category_name="Bench")
+        db.session.add(category)
+        db.session.flush()
+        sub_category = SubCategory(sub_category_name="Bench Sub", category_id=category.id)
+        cart = Cart()
+        db.session.add_all([sub_category, cart])
+        db.session.flush()
+
+        db.session.execute(insert(Product), [
+            {"product_name": f"Product {i}", "description": "Benchmark row", "price": 9.99 + i % 50,
+             "stock_qty": i % 40, "image_url": f"https://img.example/{i}.png",
+             "category_id": category.id, "sub_category_id": sub_category.id}
+            for i in range(args.rows)
+        ])
+        product_ids = db.session.scalars(db.select(Product.id).limit(2)).all()
+        db.session.execute(insert(Order), [
+            {"cart_id": cart.id, "total_amount": 40} for _ in range(args.rows)
+        ])
+        order_ids = db.session.scalars(db.select(Order.id)).all()
+        db.session.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": product_id, "quantity": 2, "price": 10, "sub_total": 20}
+            for order_id in order_ids for product_id in product_ids
+        ])
+        db.session.commit()
+
+        def products_orm():
+            [p.to_dict() for p in Product.query.all()]
+            db.session.expunge_all()
+
+        def products_projected():
+            serialize_products(project_products(Product.query).all())
+
+        def orders_orm():
+            orders = db.session.query(Order).options(
+                joinedload(Order.cart).joinedload(Cart.user),
+                joinedload(Order.items).joinedload(OrderItem.product)
+            ).all()
+            [o.to_dict(include_items=True) for o in orders]
+            db.session.expunge_all()
+
+        def orders_projected():
+            serialize_orders(project_orders(db.session.query(Order)).all())
+
+        print(f"{args.rows} rows, median of {args.repeat}")
+        for label, orm, projected in (("products", products_orm, products_projected),
+                                      ("orders+items", orders_orm, orders_projected)):
+            orm_time, projected_time = timed(orm, args.repeat), timed(projected, args.repeat)
+            print(f"  {label:<13} to_dict {orm_time * 1000:8.1f} ms   "
+                  f"projection {projected_time * 1000:8.1f} ms   x{orm_time / projected_time:.1f}")
+
+        db.session.remove()
+    os.unlink(db_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Add indexes for storefront and admin hot queries
+
+Revision ID: 3f5a2c9d1b7e
+Revises: 8490e3002096
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f5a2c9d1b7e'
+down_revision = '8490e3002096'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    active_sqlite = sa.text('status = 1')
+    active_pg = sa.text('status = true')
+    open_cart = sa.text("status = 'open'")
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_category_id', ['category_id'], unique=False)
+        batch_op.create_index('ix_products_sub_category_id', ['sub_category_id'], unique=False)
+        batch_op.create_index('ix_products_active_created', ['created_at', 'id'], unique=False,
+                              sqlite_where=active_sqlite, postgresql_where=active_pg)
+        batch_op.create_index('ix_products_active_category_created', ['category_id', 'created_at', 'id'], unique=False,
+                              sqlite_where=active_sqlite, postgresql_where=active_pg)
+        batch_op.create_index('ix_products_active_sub_category_created', ['sub_category_id', 'created_at', 'id'], unique=False,
+                              sqlite_where=active_sqlite, postgresql_where=active_pg)
+
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.create_index('ix_carts_user_open', ['user_id'], unique=False,
+                              sqlite_where=open_cart, postgresql_where=open_cart)
+        batch_op.create_index('ix_carts_session_open', ['session_id'], unique=False,
+                              sqlite_where=open_cart, postgresql_where=open_cart)
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.create_index('ix_cart_items_cart_product', ['cart_id', 'product_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_orders_cart_id', ['cart_id'], unique=False)
+        batch_op.create_index('ix_orders_status_created', ['status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index('ix_order_items_order_id', ['order_id'], unique=False)
+        batch_op.create_index('ix_order_items_product_id', ['product_id'], unique=False)
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.create_index('ix_invoices_order_id', ['order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_index('ix_invoices_order_id')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_product_id')
+        batch_op.drop_index('ix_order_items_order_id')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_status_created')
+        batch_op.drop_index('ix_orders_cart_id')
+        batch_op.drop_index('ix_orders_created_at')
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_cart_items_cart_product')
+
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_index('ix_carts_session_open')
+        batch_op.drop_index('ix_carts_user_open')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_active_sub_category_created')
+        batch_op.drop_index('ix_products_active_category_created')
+        batch_op.drop_index('ix_products_active_created')
+        batch_op.drop_index('ix_products_sub_category_id')
+        batch_op.drop_index('ix_products_category_id')
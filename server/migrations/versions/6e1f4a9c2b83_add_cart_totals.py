@@ -0,0 +1,35 @@
+"""Add running grand_total / item_count to carts
+
+Revision ID: 6e1f4a9c2b83
+Revises: d19c7e5a3f20
+Create Date: 2026-10-18 13:41:09.227815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1f4a9c2b83'
+down_revision = 'd19c7e5a3f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('grand_total', sa.Numeric(precision=10, scale=2), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('item_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing items
+    op.execute(
+        "UPDATE carts SET "
+        "grand_total = COALESCE((SELECT SUM(total_amount) FROM cart_items WHERE cart_items.cart_id = carts.id), 0), "
+        "item_count = COALESCE((SELECT SUM(quantity) FROM cart_items WHERE cart_items.cart_id = carts.id), 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_column('item_count')
+        batch_op.drop_column('grand_total')
@@ -0,0 +1,36 @@
+"""Add carts.last_activity_at for guest cart expiry
+
+Revision ID: a47c0e8d5b19
+Revises: 6e1f4a9c2b83
+Create Date: 2026-10-18 16:02:37.514296
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a47c0e8d5b19'
+down_revision = '6e1f4a9c2b83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_activity_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    # Existing carts were last active when they were last written
+    op.execute("UPDATE carts SET last_activity_at = COALESCE(updated_at, created_at)")
+
+    op.create_index('ix_carts_guest_activity', 'carts', ['last_activity_at'], unique=False,
+                    sqlite_where=sa.text("status = 'open' AND user_id IS NULL"),
+                    postgresql_where=sa.text("status = 'open' AND user_id IS NULL"))
+
+
+def downgrade():
+    op.drop_index('ix_carts_guest_activity', table_name='carts',
+                  sqlite_where=sa.text("status = 'open' AND user_id IS NULL"),
+                  postgresql_where=sa.text("status = 'open' AND user_id IS NULL"))
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_column('last_activity_at')
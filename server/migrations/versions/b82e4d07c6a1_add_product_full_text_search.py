@@ -0,0 +1,63 @@
+"""Add product full-text search index
+
+Revision ID: b82e4d07c6a1
+Revises: 3f5a2c9d1b7e
+Create Date: 2026-10-18 10:02:17.540391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b82e4d07c6a1'
+down_revision = '3f5a2c9d1b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # External-content FTS5 table + sync triggers, populated from existing rows
+        op.execute('DROP TABLE IF EXISTS products_fts')
+        op.execute(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "product_name, description, content='products', content_rowid='rowid', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+            "INSERT INTO products_fts(rowid, product_name, description) "
+            "VALUES (new.rowid, new.product_name, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, product_name, description) "
+            "VALUES ('delete', old.rowid, old.product_name, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF product_name, description ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, product_name, description) "
+            "VALUES ('delete', old.rowid, old.product_name, old.description); "
+            "INSERT INTO products_fts(rowid, product_name, description) "
+            "VALUES (new.rowid, new.product_name, new.description); END"
+        )
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == 'postgresql':
+        # GIN index on the products tsvector expression
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN "
+            "(to_tsvector('english', coalesce(products.product_name, '') || ' ' || coalesce(products.description, '')))"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS products_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS products_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS products_fts_ai')
+        op.execute('DROP TABLE IF EXISTS products_fts')
+    elif bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_products_search_vector')
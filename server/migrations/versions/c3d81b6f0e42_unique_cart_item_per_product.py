@@ -0,0 +1,43 @@
+"""Make (cart_id, product_id) unique on cart_items
+
+Revision ID: c3d81b6f0e42
+Revises: a47c0e8d5b19
+Create Date: 2026-10-18 18:27:51.906113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d81b6f0e42'
+down_revision = 'a47c0e8d5b19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fold duplicate lines into the one with the smallest id (sums keep cart totals unchanged)
+    op.execute(
+        "UPDATE cart_items SET "
+        "quantity = (SELECT SUM(d.quantity) FROM cart_items d "
+        "WHERE d.cart_id = cart_items.cart_id AND d.product_id = cart_items.product_id), "
+        "total_amount = (SELECT SUM(d.total_amount) FROM cart_items d "
+        "WHERE d.cart_id = cart_items.cart_id AND d.product_id = cart_items.product_id) "
+        "WHERE NOT EXISTS (SELECT 1 FROM cart_items k WHERE k.cart_id = cart_items.cart_id "
+        "AND k.product_id = cart_items.product_id AND k.id < cart_items.id)"
+    )
+    op.execute(
+        "DELETE FROM cart_items WHERE EXISTS (SELECT 1 FROM cart_items k WHERE k.cart_id = cart_items.cart_id "
+        "AND k.product_id = cart_items.product_id AND k.id < cart_items.id)"
+    )
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_cart_items_cart_product')
+        batch_op.create_index('uq_cart_items_cart_product', ['cart_id', 'product_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('uq_cart_items_cart_product')
+        batch_op.create_index('ix_cart_items_cart_product', ['cart_id', 'product_id'], unique=False)
@@ -0,0 +1,31 @@
+"""Add trigram indexes for fuzzy product search
+
+Revision ID: d19c7e5a3f20
+Revises: b82e4d07c6a1
+Create Date: 2026-10-18 11:26:03.872915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd19c7e5a3f20'
+down_revision = 'b82e4d07c6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres only: pg_trgm GIN indexes. Other dialects use the in-process
+    # trigram index, which is built from the products table at runtime.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING GIN (product_name gin_trgm_ops)')
+        op.execute('CREATE INDEX IF NOT EXISTS ix_products_description_trgm ON products USING GIN (description gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_products_description_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_products_name_trgm')
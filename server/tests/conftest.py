@@ -1,6 +1,8 @@
 import pytest
 import sys
 import os
+from contextlib import contextmanager
+from sqlalchemy import event
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -54,4 +56,26 @@ def test_client():
         db.create_all()
         yield flask_app.test_client()
         db.session.remove()
-        db.drop_all()
\ No newline at end of file
+        db.drop_all()
+
+@pytest.fixture
+def count_queries():
+    """
+    Context manager factory counting the SQL statements run inside its block:
+        with count_queries() as statements: ...; assert len(statements) == 2
+    """
+    @contextmanager
+    def counter():
+        statements = []
+        engine = db.engine
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counter
@@ -61,4 +61,19 @@ def test_deactivate_user(test_client, test_user, admin_token):
         headers=headers
     )
     assert response.status_code == 200
-    assert response.json["message"] == "User deactivated successfully"
\ No newline at end of file
+    assert response.json["message"] == "User deactivated successfully"
+def test_list_users_fields(test_client, test_user, admin_token, count_queries):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with test_client.application.app_context():
+        expected = {str(u.id): u.to_dict() for u in User.query.all()}
+
+    full = test_client.get("/admin/users", headers=headers).json["users"]
+    assert {u["id"]: u for u in full} == expected
+
+    with count_queries() as statements:
+        sparse = test_client.get("/admin/users?fields=username,role", headers=headers).json["users"]
+    assert all(set(u) == {"username", "role"} for u in sparse)
+    listing = [s for s in statements if "FROM users" in s and "LIMIT" in s]
+    assert listing and "email" not in listing[0]
+
+    assert test_client.get("/admin/users?fields=password_hash", headers=headers).status_code == 400
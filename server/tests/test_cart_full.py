@@ -1,5 +1,5 @@
 import pytest
-from uuid import uuid4
+from uuid import UUID, uuid4
 from server.app.models.users import User
 from server.app.models.product import Product
 from server.app.models.carts import Cart
@@ -47,3 +47,209 @@ def test_add_item_user(test_client, create_user, sample_product):
         assert response.status_code == 201
         # FIX: The API returns 'quantity', not 'stock_qty'.
         assert response.json["items"][0]["quantity"] == 1
+
+
+def test_cart_totals_follow_item_changes(test_client, create_user, sample_product):
+    with test_client.application.app_context():
+        product_id = str(sample_product.id)
+        other = Product(product_name="Other Item", price=2.5, stock_qty=50,
+                        category_id=sample_product.category_id, sub_category_id=sample_product.sub_category_id)
+        db.session.add(other)
+        db.session.commit()
+        other_id = str(other.id)
+
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+
+    added = test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_id, "quantity": 2}).json
+    assert (added["grand_total"], added["item_count"]) == (20.0, 2)
+    added = test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": other_id, "quantity": 4}).json
+    assert (added["grand_total"], added["item_count"]) == (30.0, 6)
+    added = test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_id}).json
+    assert (added["grand_total"], added["item_count"]) == (40.0, 7)
+
+    item_id = next(i["id"] for i in added["items"] if i["product"]["id"] == other_id)
+    updated = test_client.put(f"/api/carts/items/{item_id}", json={"quantity": 1}).json
+    assert (updated["grand_total"], updated["item_count"]) == (32.5, 4)
+
+    deleted = test_client.delete(f"/api/carts/items/{item_id}").json
+    assert (deleted["grand_total"], deleted["item_count"]) == (30.0, 3)
+
+    fetched = test_client.get(f"/api/carts/?user_id={create_user.id}").json
+    assert (fetched["grand_total"], fetched["item_count"]) == (30.0, 3)
+    assert fetched["grand_total"] == sum(i["total_amount"] for i in fetched["items"])
+
+
+def test_cart_query_count_is_constant(test_client, create_user, sample_product, count_queries):
+    with test_client.application.app_context():
+        products = [Product(product_name=f"Bulk {i}", price=1 + i, stock_qty=50,
+                            category_id=sample_product.category_id, sub_category_id=sample_product.sub_category_id)
+                    for i in range(8)]
+        db.session.add_all(products)
+        db.session.commit()
+        product_ids = [str(p.id) for p in products]
+
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+    counts, added = {}, 0
+    for size in (1, 8):
+        for product_id in product_ids[added:size]:
+            test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_id})
+        added = size
+        with count_queries() as get_statements:
+            cart = test_client.get(f"/api/carts/?user_id={create_user.id}").json
+        with count_queries() as add_statements:
+            test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_ids[0]})
+        assert len(cart["items"]) == size
+        counts[size] = (len(get_statements), len(add_statements))
+
+    assert counts[1] == counts[8]
+    # Cart lookup plus one joined items query
+    assert counts[8][0] == 2
+
+
+def test_batch_add_and_replace_items(test_client, create_user, sample_product, count_queries):
+    with test_client.application.app_context():
+        products = [Product(product_name=f"Look {i}", price=5 * (i + 1), stock_qty=50,
+                            category_id=sample_product.category_id, sub_category_id=sample_product.sub_category_id)
+                    for i in range(10)]
+        db.session.add_all(products)
+        db.session.commit()
+        product_ids = [str(p.id) for p in products]
+
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+    test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_ids[0]})
+
+    lines = [{"product_id": product_id, "quantity": 2} for product_id in product_ids]
+    with count_queries() as statements:
+        added = test_client.post(f"/api/carts/{cart_id}/items", json={"items": lines})
+    assert added.status_code == 201
+    assert len(added.json["items"]) == 10
+    assert added.json["item_count"] == 21
+    assert added.json["grand_total"] == 5 + sum(10 * (i + 1) for i in range(10))
+    # Cart, products, existing lines, one insert batch, the final read: not one round per line
+    assert len(statements) < 30
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) <= 6
+
+    replaced = test_client.put(f"/api/carts/{cart_id}/items", json={"items": [
+        {"product_id": product_ids[0], "quantity": 1},
+        {"product_id": product_ids[1], "quantity": 3},
+        {"product_id": product_ids[2], "quantity": 0},
+    ]})
+    assert replaced.status_code == 200
+    assert {i["product"]["id"]: i["quantity"] for i in replaced.json["items"]} == {
+        product_ids[0]: 1, product_ids[1]: 3}
+    assert (replaced.json["grand_total"], replaced.json["item_count"]) == (35.0, 4)
+
+    fetched = test_client.get(f"/api/carts/?user_id={create_user.id}").json
+    assert (fetched["grand_total"], fetched["item_count"]) == (35.0, 4)
+
+
+def test_batch_items_validation(test_client, create_user, sample_product):
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+    product_id = str(sample_product.id)
+
+    assert test_client.post(f"/api/carts/{cart_id}/items", json={"items": []}).status_code == 400
+    assert test_client.post(f"/api/carts/{cart_id}/items",
+                            json={"items": [{"product_id": product_id, "quantity": 0}]}).status_code == 400
+    assert test_client.post(f"/api/carts/{cart_id}/items",
+                            json={"items": [{"product_id": "nope"}]}).status_code == 400
+
+    missing = str(uuid4())
+    response = test_client.post(f"/api/carts/{cart_id}/items",
+                                json={"items": [{"product_id": product_id}, {"product_id": missing}]})
+    assert response.status_code == 404
+    assert response.json["product_ids"] == [missing]
+    # Nothing was written
+    assert test_client.get(f"/api/carts/?user_id={create_user.id}").json["items"] == []
+
+    response = test_client.post(f"/api/carts/{uuid4()}/items", json={"items": [{"product_id": product_id}]})
+    assert response.status_code == 404
+
+
+def test_purge_idle_guest_carts(test_client, create_user, sample_product):
+    from datetime import datetime, timedelta, timezone
+    from server.app.utils.cart_utils import parse_duration, purge_guest_carts
+
+    assert parse_duration("30d") == timedelta(days=30)
+    assert parse_duration("12h") == timedelta(hours=12)
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+    product_id = str(sample_product.id)
+    guest_ids = []
+    for i in range(5):
+        cart_id = test_client.post("/api/carts/", json={"session_id": f"idle-{i}"}).json["id"]
+        test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_id, "quantity": 2})
+        guest_ids.append(cart_id)
+    fresh_id = test_client.post("/api/carts/", json={"session_id": "fresh"}).json["id"]
+    user_cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+
+    with test_client.application.app_context():
+        # Item changes keep the activity stamp current
+        assert db.session.get(Cart, UUID(guest_ids[0])).last_activity_at is not None
+        long_ago = datetime.now(timezone.utc) - timedelta(days=45)
+        db.session.query(Cart).filter(Cart.id.in_([UUID(c) for c in guest_ids + [user_cart_id]]))\
+            .update({Cart.last_activity_at: long_ago}, synchronize_session=False)
+        db.session.commit()
+
+        report = purge_guest_carts(timedelta(days=30), batch_size=2)
+        assert (report["carts"], report["items"], report["batches"]) == (5, 5, 3)
+        remaining = {str(c.id) for c in Cart.query.all()}
+        assert remaining == {fresh_id, user_cart_id}
+        assert CartItem.query.count() == 0
+
+    result = test_client.application.test_cli_runner().invoke(args=["carts", "purge", "--older-than", "30d"])
+    assert result.exit_code == 0
+    assert "Removed 0 carts" in result.output
+
+
+def test_concurrent_adds_upsert_one_line(test_client, create_user, sample_product):
+    import threading
+
+    app = test_client.application
+    product_id = str(sample_product.id)
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+    threads, per_thread, failures = 8, 15, []
+    start = threading.Barrier(threads)
+
+    def shopper():
+        client = app.test_client()
+        start.wait()
+        for _ in range(per_thread):
+            response = client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": product_id})
+            if response.status_code != 201:
+                failures.append(response.status_code)
+
+    workers = [threading.Thread(target=shopper) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert failures == []
+    cart = test_client.get(f"/api/carts/?user_id={create_user.id}").json
+    # Every increment landed on a single line
+    assert len(cart["items"]) == 1
+    assert cart["items"][0]["quantity"] == threads * per_thread
+    assert (cart["item_count"], cart["grand_total"]) == (threads * per_thread, 10.0 * threads * per_thread)
+
+
+@pytest.mark.parametrize("quantity", [0, -3, "2", 1.5, True])
+def test_add_item_rejects_bad_quantity(test_client, create_user, sample_product, quantity):
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+    response = test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": str(sample_product.id),
+                                                           "quantity": quantity})
+    assert response.status_code == 400
+    cart = test_client.get(f"/api/carts/?user_id={create_user.id}").json
+    assert (cart["items"], cart["grand_total"], cart["item_count"]) == ([], 0.0, 0)
+
+
+def test_add_locks_cart_before_upsert(test_client, create_user, sample_product, count_queries):
+    cart_id = test_client.post("/api/carts/", json={"user_id": str(create_user.id)}).json["id"]
+    with count_queries() as statements:
+        response = test_client.post("/api/carts/items", json={"cart_id": cart_id, "product_id": str(sample_product.id)})
+    assert response.status_code == 201
+    normalized = [" ".join(statement.split()) for statement in statements]
+    lock = next(i for i, s in enumerate(normalized) if s.startswith("SELECT carts.id FROM carts WHERE carts.id IN"))
+    upsert = next(i for i, s in enumerate(normalized) if s.startswith("INSERT INTO cart_items"))
+    recalculate = next(i for i, s in enumerate(normalized) if s.startswith("UPDATE carts SET grand_total"))
+    assert lock < upsert < recalculate
@@ -53,3 +53,51 @@ def test_guest_cart_merge(test_client, create_user, sample_product):
         items = user_cart_resp.json["items"]
         # FIX: The API nests product info and uses 'quantity'.
         assert any(i["product"]["id"] == str(product.id) and i["quantity"] == 2 for i in items)
+        # The merged cart's stored totals include the guest items
+        assert user_cart_resp.json["grand_total"] == sum(i["total_amount"] for i in items)
+        assert user_cart_resp.json["item_count"] == 2
+
+
+def test_guest_cart_merge_into_existing_cart(test_client, create_user, sample_product, count_queries):
+    from server.app.models.carts import Cart
+
+    with test_client.application.app_context():
+        others = [Product(product_name=f"Merge Extra {i}", price=2, stock_qty=10,
+                          category_id=sample_product.category_id, sub_category_id=sample_product.sub_category_id)
+                  for i in range(8)]
+        db.session.add_all(others)
+        db.session.commit()
+        shared_id, extra_ids = str(sample_product.id), [str(p.id) for p in others]
+
+    user_id = str(create_user.id)
+    user_cart_id = test_client.post("/api/carts/", json={"user_id": user_id}).json["id"]
+    test_client.post("/api/carts/items", json={"cart_id": user_cart_id, "product_id": shared_id, "quantity": 1})
+
+    counts = {}
+    for size in (1, 8):
+        session_id = str(uuid4())
+        guest_cart_id = test_client.post("/api/carts/", json={"session_id": session_id}).json["id"]
+        lines = [{"product_id": shared_id, "quantity": 2}] + \
+                [{"product_id": product_id, "quantity": 1} for product_id in extra_ids[:size]]
+        test_client.post(f"/api/carts/{guest_cart_id}/items", json={"items": lines})
+
+        with count_queries() as statements:
+            login = test_client.post("/auth/login", json={"login_identifier": "merge@test.com",
+                                                          "password": "password", "session_id": session_id})
+        assert login.status_code == 200
+        counts[size] = len([s for s in statements if "cart" in s.lower()])
+
+        with test_client.application.app_context():
+            assert db.session.get(Cart, guest_cart_id) is None
+
+    cart = test_client.get(f"/api/carts/?user_id={user_id}").json
+    assert cart["id"] == user_cart_id
+    quantities = {i["product"]["id"]: i["quantity"] for i in cart["items"]}
+    assert quantities[shared_id] == 5
+    assert quantities[extra_ids[0]] == 2
+    assert all(quantities[product_id] == 1 for product_id in extra_ids[1:8])
+    assert len(cart["items"]) == 9
+    assert cart["grand_total"] == 5 * 25 + 2 * 2 + 7 * 2
+    assert cart["item_count"] == 5 + 2 + 7
+    # Merging eight lines costs the same statements as merging one
+    assert counts[1] == counts[8]
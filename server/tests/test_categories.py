@@ -3,6 +3,9 @@ import json
 from uuid import uuid4
 from server.app.models.users import User, UserRole
 from server.app.extensions import db
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+from server.app.models.product import Product
 
 @pytest.fixture
 def admin_token(test_client, new_admin):
@@ -112,4 +115,53 @@ def test_delete_category(test_client, admin_token):
     response = test_client.delete(f'/api/categories/{category_id}', headers=headers)
     assert response.status_code == 200
     data = json.loads(response.data)
-    assert data['message'] == 'Category deleted'
\ No newline at end of file
+    assert data['message'] == 'Category deleted'
+
+def test_get_categories_conditional_get(test_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = test_client.get('/api/categories/').headers['ETag']
+    assert test_client.get('/api/categories/', headers={'If-None-Match': etag}).status_code == 304
+
+    test_client.post('/api/categories/', headers=headers, data=json.dumps({"category_name": "Fragrance"}), content_type='application/json')
+    response = test_client.get('/api/categories/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert any(c['category_name'] == "Fragrance" for c in response.get_json())
+
+
+def test_category_tree_counts_without_n_plus_one(test_client, count_queries):
+    with test_client.application.app_context():
+        categories = [Category(category_name=f"Tree {i}") for i in range(4)]
+        db.session.add_all(categories)
+        db.session.flush()
+        subs = [SubCategory(sub_category_name=f"Sub {i}", category_id=c.id)
+                for c in categories for i in range(2)]
+        db.session.add_all(subs)
+        db.session.flush()
+        for i, status in enumerate([True, True, False]):
+            db.session.add(Product(product_name=f"Tree product {i}", price=1, stock_qty=1, status=status,
+                                   category_id=categories[0].id, sub_category_id=subs[0].id))
+        db.session.commit()
+        category_id, sub_category_id = categories[0].id, subs[1].id
+
+    with count_queries() as statements:
+        tree = test_client.get('/api/categories/?counts=true').get_json()
+    # ETag fingerprint, the joined tree and the grouped counts
+    assert len(statements) == 3
+    assert [node['category_name'] for node in tree] == [f"Tree {i}" for i in range(4)]
+    assert all(len(node['subcategories']) == 2 for node in tree)
+    assert tree[0]['product_count'] == 2
+    assert [sub['product_count'] for sub in tree[0]['subcategories']] == [2, 0]
+    assert tree[1]['product_count'] == 0
+
+    # Served from the cache until a catalog write invalidates it
+    with count_queries() as statements:
+        test_client.get('/api/categories/?counts=true')
+    assert len(statements) == 0
+
+    with test_client.application.app_context():
+        db.session.add(Product(product_name="Tree product new", price=1, stock_qty=1,
+                               category_id=category_id, sub_category_id=sub_category_id))
+        db.session.commit()
+    tree = test_client.get('/api/categories/?counts=true').get_json()
+    assert tree[0]['product_count'] == 3
+    assert 'product_count' not in test_client.get('/api/categories/').get_json()[0]
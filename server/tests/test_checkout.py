@@ -0,0 +1,146 @@
+import pytest
+import uuid
+from uuid import uuid4
+from server.app.extensions import db
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+from server.app.models.product import Product
+
+
+@pytest.fixture
+def checkout_products(test_client):
+    """Fixture that creates three products for checkout tests."""
+    with test_client.application.app_context():
+        category = Category(category_name="Checkout Cat")
+        db.session.add(category)
+        db.session.commit()
+
+        sub_category = SubCategory(sub_category_name="Checkout SubCat", category_id=category.id)
+        db.session.add(sub_category)
+        db.session.commit()
+
+        products = [
+            Product(product_name=f"Checkout Item {i}", price=100 * (i + 1), stock_qty=5,
+                    category_id=category.id, sub_category_id=sub_category.id)
+            for i in range(3)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        return [str(p.id) for p in products]
+
+
+def test_calculate_total(test_client, checkout_products):
+    items = [{"product_id": pid, "quantity": 2} for pid in checkout_products]
+    response = test_client.post('/api/checkout/calculate', json={"items": items})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['subtotal'] == 1200.0
+    assert data['shipping'] == 300.0
+    assert [i['product_id'] for i in data['items']] == checkout_products
+
+
+def test_calculate_total_unknown_product(test_client, checkout_products):
+    items = [{"product_id": checkout_products[0], "quantity": 1}, {"product_id": str(uuid4()), "quantity": 1}]
+    response = test_client.post('/api/checkout/calculate', json={"items": items})
+    assert response.status_code == 404
+
+
+def test_calculate_total_insufficient_stock(test_client, checkout_products):
+    response = test_client.post('/api/checkout/calculate', json={"items": [{"product_id": checkout_products[0], "quantity": 6}]})
+    assert response.status_code == 400
+    assert 'Insufficient stock' in response.get_json()['error']
+
+
+def _buyer(test_client, n=0):
+    """A user with an open cart (orders need one); returns the user id."""
+    from server.app.models.users import User
+    from server.app.models.carts import Cart
+    with test_client.application.app_context():
+        user = User(username=f"buyer{n}", email=f"buyer{n}@test.com", first_name="Buy", last_name="Er",
+                    primary_phone_no=f"buyerphone{n}", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Cart(user_id=user.id))
+        db.session.commit()
+        return str(user.id)
+
+
+@pytest.fixture
+def checkout_user(test_client):
+    return _buyer(test_client)
+
+
+def _stock(test_client, product_ids):
+    with test_client.application.app_context():
+        return [db.session.get(Product, uuid.UUID(pid)).stock_qty for pid in product_ids]
+
+
+def test_process_checkout_reserves_stock(test_client, checkout_products, checkout_user):
+    from server.app.models.order_items import OrderItem
+    items = [{"product_id": pid, "quantity": 2} for pid in checkout_products]
+    response = test_client.post('/api/checkout/process', json={"user_id": checkout_user, "payment_method": "mpesa",
+                                                               "items": items})
+    assert response.status_code == 201
+    assert _stock(test_client, checkout_products) == [3, 3, 3]
+    with test_client.application.app_context():
+        assert OrderItem.query.count() == 3
+
+
+def test_checkout_keeps_search_indexes(test_client, checkout_products, checkout_user):
+    from server.app.utils.suggest import get_suggest_index
+    from server.app.utils.trigram import get_trigram_index
+    app = test_client.application
+    with app.app_context():
+        built = (get_suggest_index().built_at, get_trigram_index().built_at)
+
+    response = test_client.post('/api/checkout/process', json={
+        "user_id": checkout_user, "payment_method": "mpesa",
+        "items": [{"product_id": checkout_products[0], "quantity": 1}]})
+    assert response.status_code == 201
+
+    # A stock-only change updates the reserved rows in place; no full rebuild
+    suggest, trigram = app.extensions["suggest_index"], app.extensions["trigram_index"]
+    assert (suggest.built_at, trigram.built_at) == built
+    assert any(s["id"] == checkout_products[0] for s in suggest.suggest("checkout item"))
+
+
+def test_process_checkout_takes_nothing_when_a_line_falls_short(test_client, checkout_products, checkout_user):
+    # Each line fits on its own; together they need 6 of a product with 5 in stock
+    items = [{"product_id": checkout_products[1], "quantity": 1},
+             {"product_id": checkout_products[0], "quantity": 3},
+             {"product_id": checkout_products[0], "quantity": 3}]
+    response = test_client.post('/api/checkout/process', json={"user_id": checkout_user, "payment_method": "mpesa",
+                                                               "items": items})
+    assert response.status_code == 400
+    assert 'Insufficient stock for Checkout Item 0' in response.get_json()['error']
+    assert _stock(test_client, checkout_products) == [5, 5, 5]
+
+
+def test_concurrent_checkouts_do_not_oversell(test_client, checkout_products):
+    import threading
+    from server.app.models.orders import Order
+
+    app = test_client.application
+    buyers, statuses = 12, []
+    user_ids = [_buyer(test_client, n) for n in range(1, buyers + 1)]
+    start = threading.Barrier(buyers)
+
+    def buy(user_id):
+        client = app.test_client()
+        start.wait()
+        response = client.post('/api/checkout/process', json={
+            "user_id": user_id, "payment_method": "mpesa",
+            "items": [{"product_id": checkout_products[0], "quantity": 1}]})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=buy, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Five in stock: five orders, the rest turned away, never below zero
+    assert sorted(statuses) == [201] * 5 + [400] * (buyers - 5)
+    assert _stock(test_client, checkout_products)[0] == 0
+    with app.app_context():
+        assert Order.query.count() == 5
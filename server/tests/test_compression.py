@@ -0,0 +1,70 @@
+import gzip
+import json
+
+from server.app.extensions import db
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+from server.app.models.product import Product
+
+
+def _seed_products(app, count=20):
+    with app.app_context():
+        category = Category(category_name="Compressed")
+        db.session.add(category)
+        db.session.flush()
+        sub_category = SubCategory(sub_category_name="Compressed Sub", category_id=category.id)
+        db.session.add(sub_category)
+        db.session.flush()
+        db.session.add_all([
+            Product(product_name=f"Gzip Product {i}", description="Compresses well " * 5, price=10,
+                    stock_qty=1, category_id=category.id, sub_category_id=sub_category.id)
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def test_gzip_negotiation_and_threshold(test_client):
+    _seed_products(test_client.application)
+    plain = test_client.get('/api/products/?per_page=20')
+    assert 'Content-Encoding' not in plain.headers
+
+    response = test_client.get('/api/products/?per_page=20', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) < len(plain.data)
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+    # Weak ETag on the compressed body still revalidates
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert test_client.get('/api/products/?per_page=20', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': etag
+    }).status_code == 304
+
+    # Small bodies and q=0 are left alone
+    small = test_client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    refused = test_client.get('/api/products/?per_page=20', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+
+def test_cached_responses_reuse_compressed_bytes(test_client, monkeypatch):
+    from server.app.utils import compression
+    _seed_products(test_client.application)
+    calls = []
+    original = compression.compress
+    monkeypatch.setattr(compression, 'compress', lambda *args: calls.append(args) or original(*args))
+
+    headers = {'Accept-Encoding': 'gzip'}
+    first = test_client.get('/api/products/?per_page=20', headers=headers)
+    second = test_client.get('/api/products/?per_page=20', headers=headers)
+    assert first.data == second.data
+    assert len(calls) == 1
+
+    # A catalog write drops the entry together with its compressed body
+    with test_client.application.app_context():
+        Product.query.first().product_name = "Renamed"
+        db.session.commit()
+    third = test_client.get('/api/products/?per_page=20', headers=headers)
+    assert len(calls) == 2
+    assert b"Renamed" in gzip.decompress(third.data)
@@ -0,0 +1,156 @@
+import pytest
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+from server.app.models.users import User
+from server.app.models.product import Product
+from server.app.models.carts import Cart
+from server.app.models.cart_items import CartItem
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
+from server.app.extensions import db
+from server.app.utils import cart_repository
+from server.app.utils.product_utils import load_products
+from server.app.utils.cart_repository import GuestCartRepository, MemoryCartBackend, SqliteCartBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def guest_client(request, test_client, tmp_path):
+    """Test client whose guest carts live in a key-value store instead of SQL."""
+    backend = MemoryCartBackend() if request.param == "memory" else SqliteCartBackend(str(tmp_path / "guest.db"))
+    test_client.application.extensions["guest_cart_store"] = GuestCartRepository(backend)
+    yield test_client
+
+
+@pytest.fixture
+def products(test_client):
+    with test_client.application.app_context():
+        category = Category(category_name="Guest Cat")
+        db.session.add(category)
+        db.session.commit()
+        sub_category = SubCategory(sub_category_name="Guest SubCat", category_id=category.id)
+        db.session.add(sub_category)
+        db.session.commit()
+        items = [Product(product_name=f"Guest Item {i}", price=10 * (i + 1), stock_qty=50,
+                         category_id=category.id, sub_category_id=sub_category.id) for i in range(3)]
+        db.session.add_all(items)
+        db.session.commit()
+        yield [str(p.id) for p in items]
+
+
+def _writes(statements):
+    return [s for s in statements if s.lstrip().split()[0].upper() in ("INSERT", "UPDATE", "DELETE")]
+
+
+def test_guest_cart_never_writes_sql(guest_client, products, count_queries):
+    with count_queries() as statements:
+        cart = guest_client.post("/api/carts/", json={"session_id": "visitor"}).json
+        added = guest_client.post("/api/carts/items", json={"cart_id": cart["id"], "product_id": products[0]})
+        assert added.status_code == 201
+        batch = guest_client.post(f"/api/carts/{cart['id']}/items", json={"items": [
+            {"product_id": products[0], "quantity": 2}, {"product_id": products[1], "quantity": 1}]}).json
+        assert (batch["grand_total"], batch["item_count"]) == (50.0, 4)
+
+        line_id = next(i["id"] for i in batch["items"] if i["product"]["id"] == products[1])
+        updated = guest_client.put(f"/api/carts/items/{line_id}", json={"quantity": 3}).json
+        assert (updated["grand_total"], updated["item_count"]) == (90.0, 6)
+
+        fetched = guest_client.get("/api/carts/?session_id=visitor").json
+        assert fetched["id"] == cart["id"]
+        assert {i["product"]["id"]: i["quantity"] for i in fetched["items"]} == {products[0]: 3, products[1]: 3}
+
+        deleted = guest_client.delete(f"/api/carts/items/{line_id}").json
+        assert (deleted["grand_total"], deleted["item_count"]) == (30.0, 3)
+        assert guest_client.delete(f"/api/carts/items/{line_id}").status_code == 404
+
+    assert _writes(statements) == []
+    with guest_client.application.app_context():
+        assert Cart.query.count() == 0
+
+
+def test_guest_cart_is_persisted_on_login(guest_client, products):
+    with guest_client.application.app_context():
+        user = User(username="guestuser", email="guest@test.com", first_name="Guest", last_name="User",
+                    primary_phone_no="guestphone")
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+        user_id = str(user.id)
+
+    user_cart_id = guest_client.post("/api/carts/", json={"user_id": user_id}).json["id"]
+    guest_client.post("/api/carts/items", json={"cart_id": user_cart_id, "product_id": products[0]})
+
+    session_id = str(uuid4())
+    guest_id = guest_client.get(f"/api/carts/?session_id={session_id}").json["id"]
+    guest_client.post(f"/api/carts/{guest_id}/items", json={"items": [
+        {"product_id": products[0], "quantity": 2}, {"product_id": products[2], "quantity": 1}]})
+
+    login = guest_client.post("/auth/login", json={"login_identifier": "guest@test.com", "password": "password",
+                                                   "session_id": session_id})
+    assert login.status_code == 200
+
+    cart = guest_client.get(f"/api/carts/?user_id={user_id}").json
+    assert cart["id"] == user_cart_id
+    assert {i["product"]["id"]: i["quantity"] for i in cart["items"]} == {products[0]: 3, products[2]: 1}
+    assert (cart["grand_total"], cart["item_count"]) == (60.0, 4)
+    # The guest cart left the store, so the session starts over with an empty cart
+    assert guest_client.get(f"/api/carts/?session_id={session_id}").json["items"] == []
+    with guest_client.application.app_context():
+        assert CartItem.query.count() == 2
+
+
+def test_failed_merge_keeps_guest_cart(guest_client, products, monkeypatch):
+    from server.app.utils import cart_utils
+
+    session_id = str(uuid4())
+    guest_id = guest_client.get(f"/api/carts/?session_id={session_id}").json["id"]
+    added = guest_client.post(f"/api/carts/{guest_id}/items", json={"items": [
+        {"product_id": products[0], "quantity": 2}, {"product_id": products[1], "quantity": 1}]}).json
+
+    def fail(cart_id, lines):
+        raise RuntimeError("database unavailable")
+
+    with guest_client.application.app_context():
+        user = User(username="unlucky", email="unlucky@test.com", first_name="Un", last_name="Lucky",
+                    primary_phone_no="unluckyphone", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        monkeypatch.setattr(cart_utils, "upsert_cart_lines", fail)
+        with pytest.raises(RuntimeError):
+            cart_utils.merge_guest_cart(user.id, session_id)
+        assert CartItem.query.count() == 0
+
+    # The guest cart, its session and its lines are all back in the store
+    cart = guest_client.get(f"/api/carts/?session_id={session_id}").json
+    assert cart["id"] == guest_id
+    assert cart["items"] == added["items"]
+    line_id = added["items"][0]["id"]
+    assert guest_client.put(f"/api/carts/items/{line_id}", json={"quantity": 1}).status_code == 200
+
+
+def test_guest_carts_expire(tmp_path):
+    for backend in (MemoryCartBackend(), SqliteCartBackend(str(tmp_path / "expiry.db"))):
+        store = GuestCartRepository(backend, ttl=-1)
+        cart = store.create(session_id="gone")
+        # The cart document and the session index
+        assert backend.purge_expired() == 2
+        assert store.get(cart["id"]) is None
+        assert store.find_open(session_id="gone") is None
+
+
+def test_guest_cart_writes_keep_session_alive(test_client, products, tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cart_repository, "time", SimpleNamespace(time=lambda: clock[0]))
+    product_id = UUID(products[0])
+    with test_client.application.app_context():
+        loaded = load_products([product_id])
+        for backend in (MemoryCartBackend(), SqliteCartBackend(str(tmp_path / "ttl.db"))):
+            store = GuestCartRepository(backend, ttl=100)
+            clock[0] = 1000.0
+            cart = store.create(session_id="busy")
+            clock[0] = 1090.0
+            store.add_lines(cart["id"], {product_id: 1}, loaded)
+            # Past the creation TTL, but within the TTL of the last write
+            clock[0] = 1150.0
+            found = store.find_open(session_id="busy")
+            assert found is not None and found["id"] == cart["id"]
+            assert store.take("busy")["id"] == cart["id"]
@@ -0,0 +1,67 @@
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import event
+from server.app.extensions import db
+from server.app.models.product import Product
+from server.app.models.carts import Cart
+from server.app.models.orders import Order
+from server.app.models.order_items import OrderItem
+from server.app.models.enums import CartStatus
+
+
+@contextmanager
+def query_plans():
+    """Record the SQLite query plan of every SELECT executed inside the block."""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            rows = cursor.connection.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            plans.append(" | ".join(row[-1] for row in rows))
+
+    event.listen(db.engine, "before_cursor_execute", explain)
+    try:
+        yield plans
+    finally:
+        event.remove(db.engine, "before_cursor_execute", explain)
+
+
+@pytest.fixture
+def sqlite_only(test_client):
+    with test_client.application.app_context():
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("query plan assertions use SQLite EXPLAIN QUERY PLAN")
+        yield
+
+
+def test_active_product_listing_uses_partial_index(test_client, sqlite_only):
+    with query_plans() as plans:
+        test_client.get("/api/products/?per_page=5")
+    assert any("ix_products_active_created" in plan for plan in plans)
+
+
+def test_category_listing_uses_index(test_client, sqlite_only):
+    category_id = uuid4()
+    with query_plans() as plans:
+        Product.query.filter(Product.status == True, Product.category_id == category_id)\
+            .order_by(Product.created_at.desc()).limit(10).all()
+    assert any("ix_products_active_category_created" in plan for plan in plans)
+
+
+def test_open_cart_lookup_uses_partial_index(test_client, sqlite_only):
+    with query_plans() as plans:
+        Cart.query.filter_by(session_id="guest-session", status=CartStatus.open).first()
+        Cart.query.filter_by(user_id=uuid4(), status=CartStatus.open).first()
+    assert "ix_carts_session_open" in plans[0]
+    assert "ix_carts_user_open" in plans[1]
+
+
+def test_order_lookups_use_indexes(test_client, sqlite_only):
+    now = datetime.now()
+    with query_plans() as plans:
+        OrderItem.query.filter_by(order_id=uuid4()).all()
+        Order.query.filter(Order.created_at.between(now - timedelta(days=1), now)).count()
+    assert "ix_order_items_order_id" in plans[0]
+    assert "ix_orders_created_at" in plans[1]
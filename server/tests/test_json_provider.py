@@ -0,0 +1,55 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from flask import jsonify
+
+from server.app.models.enums import OrderStatus
+from server.app.utils import json_provider
+from server.app.utils.json_provider import OrjsonProvider, StdlibJSONProvider, init_json_provider
+
+PAYLOAD = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "total": Decimal("19.90"),
+    "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 600000),
+    "day": datetime.date(2025, 1, 2),
+    "status": OrderStatus.paid,
+    "items": [{"b": 1, "a": None}],
+}
+EXPECTED = {
+    "id": "12345678-1234-5678-1234-567812345678",
+    "total": 19.9,
+    "created_at": "2025-01-02T03:04:05.600000",
+    "day": "2025-01-02",
+    "status": "paid",
+    "items": [{"a": None, "b": 1}],
+}
+
+
+@pytest.mark.skipif(json_provider.orjson is None, reason="orjson not installed")
+def test_orjson_provider_is_default_and_matches_stdlib(test_client):
+    app = test_client.application
+    assert isinstance(app.json, OrjsonProvider)
+
+    fast = app.json.dumps(PAYLOAD)
+    slow = StdlibJSONProvider(app).dumps(PAYLOAD)
+    assert json.loads(fast) == json.loads(slow) == EXPECTED
+    # Keys stay sorted like Flask's default provider
+    assert fast.index('"created_at"') < fast.index('"id"')
+
+    with app.test_request_context():
+        response = jsonify(PAYLOAD)
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data()) == EXPECTED
+
+
+def test_stdlib_provider_fallback(test_client, monkeypatch):
+    app = test_client.application
+    monkeypatch.setattr(json_provider, "orjson", None)
+    init_json_provider(app)
+    assert type(app.json) is StdlibJSONProvider
+
+    with app.test_request_context():
+        assert json.loads(jsonify(PAYLOAD).get_data()) == EXPECTED
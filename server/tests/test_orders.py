@@ -5,6 +5,10 @@ from server.app.models.orders import Order, OrderStatus
 from server.app.models.users import User, UserRole
 from server.app.extensions import db
 from server.app.models.carts import Cart
+from server.app.models.order_items import OrderItem
+from server.app.models.product import Product
+from server.app.models.category import Category
+from server.app.models.sub_category import SubCategory
 
 
 @pytest.fixture
@@ -161,3 +165,44 @@ def test_cannot_cancel_after_delivered(test_client, sample_order, admin_token):
     assert data["requested_status"] == "cancelled"
     assert data["allowed_transitions"] == []
 
+
+
+def test_order_list_matches_to_dict(test_client, user_with_orders, sample_order):
+    """The column-projected order list renders exactly what Order.to_dict does."""
+    with test_client.application.app_context():
+        category = Category(category_name="Orders Category")
+        db.session.add(category)
+        db.session.flush()
+        sub_category = SubCategory(sub_category_name="Orders Sub", category_id=category.id)
+        db.session.add(sub_category)
+        db.session.flush()
+        product = Product(product_name="Ordered", price=20, stock_qty=3,
+                          category_id=category.id, sub_category_id=sub_category.id)
+        db.session.add(product)
+        db.session.flush()
+        order = Order.query.filter(Order.total_amount == 100).one()
+        db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=2, price=20, sub_total=40))
+        db.session.commit()
+
+        expected = {str(o.id): o.to_dict(include_items=True) for o in Order.query.all()}
+
+    orders = test_client.get("/api/orders/?per_page=10").get_json()['orders']
+    assert len(orders) == 3
+    assert {o['id']: o for o in orders} == expected
+
+    search = test_client.get("/api/orders/?search=Test").get_json()['orders']
+    assert len(search) == 2
+
+
+def test_order_list_fields(test_client, user_with_orders, count_queries):
+    with count_queries() as statements:
+        orders = test_client.get("/api/orders/?fields=id,status,total_amount").get_json()['orders']
+    assert len(orders) == 2
+    assert all(set(order) == {'id', 'status', 'total_amount'} for order in orders)
+    # No customer join and no item query
+    assert not any('users' in statement or 'order_items' in statement for statement in statements)
+
+    orders = test_client.get("/api/orders/?fields=id,customer").get_json()['orders']
+    assert all(order['customer']['username'] == 'testuser' for order in orders)
+
+    assert test_client.get("/api/orders/?fields=id,secret").status_code == 400
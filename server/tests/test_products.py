@@ -343,4 +343,336 @@ def test_get_products_normal_user(test_client, user_token, sample_product_data):
     data = res.get_json()["products"]
 
     # Regular users should never see inactive/deleted products
-    assert all(p["status"] == True for p in data)
\ No newline at end of file
+    assert all(p["status"] == True for p in data)
+
+@pytest.fixture
+def many_products(test_client):
+    """Fixture that creates 25 active products sharing one category."""
+    with test_client.application.app_context():
+        category = Category(category_name="Paging Category")
+        db.session.add(category)
+        db.session.commit()
+
+        sub_category = SubCategory(sub_category_name="Paging SubCategory", category_id=category.id)
+        db.session.add(sub_category)
+        db.session.commit()
+
+        products = [
+            Product(
+                product_name=f"Paged Product {i}",
+                price=5 + i,
+                stock_qty=10,
+                category_id=category.id,
+                sub_category_id=sub_category.id
+            ) for i in range(25)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        return str(category.id)
+
+
+def test_cursor_pagination_walks_all_products(test_client, many_products):
+    """Following next_cursor visits every product exactly once, then stops."""
+    seen = []
+    response = test_client.get(f'/api/products/?category_id={many_products}&per_page=10&cursor=')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert 'total' not in data
+    assert data['prev_cursor'] is None
+
+    while True:
+        seen.extend(p['id'] for p in data['products'])
+        if not data['next_cursor']:
+            break
+        response = test_client.get(f"/api/products/?category_id={many_products}&per_page=10&cursor={data['next_cursor']}")
+        assert response.status_code == 200
+        data = response.get_json()
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+def test_cursor_pagination_prev_cursor_returns_previous_page(test_client, many_products):
+    first = test_client.get(f'/api/products/?category_id={many_products}&per_page=10&cursor=').get_json()
+    second = test_client.get(f"/api/products/?category_id={many_products}&per_page=10&cursor={first['next_cursor']}").get_json()
+    assert second['prev_cursor']
+
+    back = test_client.get(f"/api/products/?category_id={many_products}&per_page=10&cursor={second['prev_cursor']}").get_json()
+    assert [p['id'] for p in back['products']] == [p['id'] for p in first['products']]
+    assert back['prev_cursor'] is None
+
+
+def test_cursor_pagination_total_only_on_request(test_client, many_products):
+    response = test_client.get(f'/api/products/?category_id={many_products}&per_page=5&cursor=&include_total=true')
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 25
+
+
+def test_cursor_pagination_invalid_cursor(test_client):
+    response = test_client.get('/api/products/?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+
+def test_cursor_pagination_caps_per_page(test_client, many_products):
+    response = test_client.get(f'/api/products/?category_id={many_products}&cursor=&per_page=1000000')
+    assert response.status_code == 200
+    assert response.get_json()['per_page'] == 100
+
+
+def test_listing_errors_are_not_reported_as_invalid_cursor(test_client, monkeypatch):
+    """Only a bad cursor token maps to 'Invalid cursor'; other failures keep their message."""
+    from server.app.routes import products as products_routes
+
+    def broken_search(term):
+        raise ValueError('search backend unavailable')
+
+    monkeypatch.setattr(products_routes, 'search_condition', broken_search)
+    response = test_client.get('/api/products/?cursor=&search=lipstick')
+    assert response.status_code == 500
+    assert response.get_json()['error'] == 'search backend unavailable'
+
+
+def test_catalog_cache_serves_repeat_reads(test_client, admin_token, sample_product_data):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    cache = test_client.application.extensions['catalog_cache']
+    cache.invalidate()
+
+    first = test_client.get('/api/products/?per_page=5')
+    second = test_client.get('/api/products/?per_page=5')
+    assert first.get_json() == second.get_json()
+
+    stats = test_client.get('/api/products/cache/stats', headers=headers).get_json()
+    assert stats['misses'] >= 1
+    assert stats['hits'] >= 1
+
+
+def test_catalog_cache_invalidated_on_product_write(test_client, admin_token, sample_product_data):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    post_response = test_client.post('/api/products/', headers=headers, data=json.dumps(sample_product_data), content_type='application/json')
+    product_id = json.loads(post_response.data)['id']
+
+    assert test_client.get(f'/api/products/{product_id}').get_json()['price'] == 10.99
+    before = test_client.get('/api/products/?per_page=50').get_json()
+    assert any(p['id'] == product_id for p in before['products'])
+
+    test_client.put(f'/api/products/{product_id}', headers=headers, data=json.dumps({"price": 20.5}), content_type='application/json')
+    assert test_client.get(f'/api/products/{product_id}').get_json()['price'] == 20.5
+
+    test_client.delete(f'/api/products/{product_id}', headers=headers)
+    after = test_client.get('/api/products/?per_page=50').get_json()
+    assert all(p['id'] != product_id for p in after['products'])
+
+
+def test_catalog_cache_evicts_least_recently_used():
+    from werkzeug.datastructures import MultiDict
+    from server.app.utils.catalog_cache import CatalogCache, cache_key
+
+    cache = CatalogCache(max_entries=2, ttl=60)
+    cache.set(cache_key('a'), 1)
+    cache.set(cache_key('b'), 2)
+    assert cache.get(cache_key('a')) == 1
+    cache.set(cache_key('c'), 3)
+
+    assert cache.get(cache_key('b')) is None
+    assert cache.evictions == 1
+    assert cache_key('x', MultiDict([('page', '1'), ('sort', 'asc')])) == cache_key('x', MultiDict([('sort', 'asc'), ('page', '1')]))
+
+
+def test_product_list_conditional_get(test_client, admin_token, sample_product_data):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = test_client.get('/api/products/')
+    etag = response.headers['ETag']
+    assert etag
+
+    not_modified = test_client.get('/api/products/', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+    # A different query gets its own validator
+    other = test_client.get('/api/products/?sort=asc')
+    assert other.headers['ETag'] != etag
+
+    # Any catalog write changes the validator
+    test_client.post('/api/products/', headers=headers, data=json.dumps(sample_product_data), content_type='application/json')
+    changed = test_client.get('/api/products/', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_get_products_batch(test_client, many_products):
+    listing = test_client.get(f'/api/products/?category_id={many_products}&per_page=3').get_json()['products']
+    ids = [p['id'] for p in listing]
+    missing = str(uuid4())
+
+    response = test_client.get(f"/api/products/batch?ids={','.join(ids + [missing])}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert all(data['products'][i]['id'] == i for i in ids)
+    assert data['products'][missing] is None
+    assert data['not_found'] == [missing]
+
+
+def test_get_products_batch_validation(test_client):
+    assert test_client.get('/api/products/batch').status_code == 400
+    assert test_client.get('/api/products/batch?ids=not-a-uuid').status_code == 400
+
+    too_many = ','.join(str(uuid4()) for _ in range(101))
+    assert test_client.get(f'/api/products/batch?ids={too_many}').status_code == 400
+
+
+def test_product_list_facets(test_client, sample_product_data, many_products):
+    response = test_client.get('/api/products/?facets=true&per_page=5')
+    assert response.status_code == 200
+    facets = response.get_json()['facets']
+
+    counts = {c['id']: c['count'] for c in facets['categories']}
+    assert counts[many_products] == 25
+    assert counts[sample_product_data['category_id']] == 2
+    assert sum(s['count'] for s in facets['sub_categories']) == 27
+    # Paged products are priced 5..29, the fixture ones 10.99 and 15.99
+    assert facets['price'][0] == {'min': 0, 'max': 500, 'count': 27}
+    assert sum(b['count'] for b in facets['price']) == 27
+
+    # Facets follow the active filters
+    filtered = test_client.get(f'/api/products/?facets=1&category_id={many_products}').get_json()['facets']
+    assert [c['id'] for c in filtered['categories']] == [many_products]
+
+    assert 'facets' not in test_client.get('/api/products/').get_json()
+
+
+def test_bulk_import_csv(test_client, admin_token, sample_product_data):
+    from io import BytesIO
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    csv_body = (
+        "product_name,description,price,stock_qty,category_name,sub_category_name,image_url\n"
+        "Imported Serum,Bright,12.50,7,test category,Test SubCategory,http://img/1.png\n"
+        "Imported Toner,,8,3,Test Category,Test SubCategory,\n"
+        "No Price,,abc,3,Test Category,Test SubCategory,\n"
+        "Bad Category,,5,3,Nope,Test SubCategory,\n"
+        "Imported Mask,,4.99,1,Test Category,Test SubCategory,\n"
+    )
+    response = test_client.post(
+        '/api/products/import?chunk_size=2',
+        data={'file': (BytesIO(csv_body.encode()), 'products.csv')},
+        headers=headers, content_type='multipart/form-data'
+    )
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['processed'] == 5
+    assert report['imported'] == 3
+    assert [e['row'] for e in report['errors']] == [3, 4]
+    assert 'price' in report['errors'][0]['error']
+
+    with test_client.application.app_context():
+        serum = Product.query.filter_by(product_name='Imported Serum').one()
+        assert str(serum.category_id) == sample_product_data['category_id']
+        assert float(serum.price) == 12.5 and serum.stock_qty == 7
+
+
+def test_bulk_import_ndjson_and_auth(test_client, admin_token, sample_product_data):
+    rows = [
+        {"product_name": "Json Balm", "price": 3, "stock_qty": 2,
+         "category_id": sample_product_data['category_id'],
+         "sub_category_id": sample_product_data['sub_category_id']},
+        {"product_name": "Json Bad Sub", "price": 3, "stock_qty": 2,
+         "category_id": sample_product_data['category_id'], "sub_category_id": str(uuid4())},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+
+    assert test_client.post('/api/products/import?format=ndjson', data=body).status_code == 401
+
+    response = test_client.post('/api/products/import?format=ndjson', data=body,
+                                headers={'Authorization': f'Bearer {admin_token}'})
+    report = response.get_json()
+    assert report['imported'] == 1
+    assert [e['row'] for e in report['errors']] == [2, 3]
+
+    # Imported rows show up in listings straight away
+    names = [p['product_name'] for p in test_client.get('/api/products/').get_json()['products']]
+    assert 'Json Balm' in names
+
+
+def test_bulk_stock_adjustments(test_client, admin_token, sample_product_data):
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    with test_client.application.app_context():
+        first = str(Product.query.filter_by(product_name='Product 1').one().id)
+        second = str(Product.query.filter_by(product_name='Product 2').one().id)
+    unknown = str(uuid4())
+
+    response = test_client.post('/api/products/stock-adjustments', json={'adjustments': [
+        {'product_id': first, 'delta': -10},
+        {'product_id': first, 'delta': 2},
+        {'product_id': second, 'delta': -1000},
+        {'product_id': unknown, 'delta': 5},
+    ]}, headers=headers)
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['updated'] == 1
+    assert report['unknown_ids'] == [unknown]
+    assert report['rejected_ids'] == [second]
+
+    response = test_client.post('/api/products/stock-adjustments', json=[
+        {'product_id': second, 'stock_qty': 7}
+    ], headers=headers)
+    assert response.get_json()['updated'] == 1
+
+    assert test_client.get(f'/api/products/{first}').get_json()['stock_qty'] == 42
+    assert test_client.get(f'/api/products/{second}').get_json()['stock_qty'] == 7
+
+    mixed = [{'product_id': first, 'delta': 1}, {'product_id': second, 'stock_qty': 1}]
+    assert test_client.post('/api/products/stock-adjustments', json=mixed, headers=headers).status_code == 400
+
+
+def test_product_list_matches_to_dict(test_client, sample_product_data, many_products):
+    """The column-projected list renders exactly what Product.to_dict does."""
+    with test_client.application.app_context():
+        expected = {str(p.id): p.to_dict() for p in Product.query.all()}
+
+    listed = test_client.get('/api/products/?per_page=100').get_json()['products']
+    assert {p['id']: p for p in listed} == expected
+    paged = test_client.get('/api/products/?cursor=&per_page=100').get_json()['products']
+    assert paged == listed
+
+
+def test_category_products_keyset_pages(test_client, many_products):
+    seen, cursor = [], ''
+    while cursor is not None:
+        response = test_client.get(f'/api/products/categories/{many_products}?per_page=10&cursor={cursor}')
+        assert response.status_code == 200
+        data = response.get_json()
+        seen += [p['id'] for p in data['products']]
+        cursor = data['next_cursor']
+    assert len(seen) == len(set(seen)) == 25
+
+    # The bare request keeps returning the full array
+    assert len(test_client.get(f'/api/products/categories/{many_products}').get_json()) == 25
+    assert test_client.get(f'/api/products/categories/{many_products}?cursor=bogus').status_code == 400
+    assert test_client.get('/api/products/categories/not-a-uuid').status_code == 400
+
+
+def test_subcategory_products_ndjson_stream(test_client, many_products):
+    with test_client.application.app_context():
+        sub_category_id = str(Product.query.filter_by(category_id=many_products).first().sub_category_id)
+
+    response = test_client.get(f'/api/products/subcategories/{sub_category_id}?format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 25
+    assert all(line['sub_category_id'] == sub_category_id for line in lines)
+
+
+def test_product_list_fields(test_client, sample_product_data, count_queries):
+    with count_queries() as statements:
+        products = test_client.get('/api/products/?fields=id,product_name,price,image_url').get_json()['products']
+    assert all(set(p) == {'id', 'product_name', 'price', 'image_url'} for p in products)
+    listing = [s for s in statements if 'FROM products' in s and 'LIMIT' in s]
+    assert listing and 'description' not in listing[0]
+
+    products = test_client.get(f"/api/products/categories/{sample_product_data['category_id']}?fields=product_name")
+    assert sorted(p['product_name'] for p in products.get_json()) == ['Product 1', 'Product 2']
+
+    response = test_client.get('/api/products/?fields=product_name,nope')
+    assert response.status_code == 400
+    assert 'nope' in response.get_json()['error']
@@ -98,4 +98,106 @@ def test_search_empty_query(test_client, sample_data):
 
     assert len(data['products']) == 0
     assert len(data['categories']) == 0
-    assert len(data['sub_categories']) == 0
\ No newline at end of file
+    assert len(data['sub_categories']) == 0
+def test_search_ranks_name_matches_first(test_client, sample_data):
+    """A product named after the term outranks one that only mentions it in its description"""
+    response = test_client.get('/api/search/?q=moisturizer')
+    names = [p['product_name'] for p in response.get_json()['products']]
+    assert names[0] == "Hydrating Moisturizer"
+
+    response = test_client.get('/api/search/?q=lipstick')
+    names = [p['product_name'] for p in response.get_json()['products']]
+    assert names == ["Ruby Red Lipstick"]
+
+def test_search_matches_word_prefixes_and_all_words(test_client, sample_data):
+    data = test_client.get('/api/search/?q=lip').get_json()
+    assert [p['product_name'] for p in data['products']] == ["Ruby Red Lipstick"]
+
+    data = test_client.get('/api/search/?q=red balm').get_json()
+    assert [p['product_name'] for p in data['products']] == ["Soothing Red Balm"]
+
+def test_search_index_follows_product_updates(test_client, sample_data):
+    with test_client.application.app_context():
+        product = Product.query.filter_by(product_name="Soothing Red Balm").first()
+        product.product_name = "Soothing Aloe Balm"
+        db.session.commit()
+
+        hydrating = Product.query.filter_by(product_name="Hydrating Moisturizer").first()
+        db.session.delete(hydrating)
+        db.session.commit()
+
+    names = [p['product_name'] for p in test_client.get('/api/search/?q=aloe').get_json()['products']]
+    assert names == ["Soothing Aloe Balm"]
+    assert test_client.get('/api/search/?q=hydrating').get_json()['products'] == []
+
+def test_products_search_filter_uses_full_text(test_client, sample_data):
+    data = test_client.get('/api/products/?search=red').get_json()
+    assert sorted(p['product_name'] for p in data['products']) == ["Ruby Red Lipstick", "Soothing Red Balm"]
+
+def test_suggest_completes_names(test_client, sample_data):
+    response = test_client.get('/api/search/suggest?prefix=mo')
+    assert response.status_code == 200
+    suggestions = response.get_json()['suggestions']
+    assert [(s['type'], s['name']) for s in suggestions] == [
+        ("sub_category", "Moisturizer"),
+        ("product", "Hydrating Moisturizer"),
+    ]
+
+    names = [s['name'] for s in test_client.get('/api/search/suggest?prefix=Re').get_json()['suggestions']]
+    assert set(names) == {"Ruby Red Lipstick", "Soothing Red Balm"}
+
+    assert test_client.get('/api/search/suggest?prefix=').get_json()['suggestions'] == []
+
+def test_suggest_index_updates_incrementally(test_client, sample_data):
+    assert test_client.get('/api/search/suggest?prefix=glow').get_json()['suggestions'] == []
+
+    with test_client.application.app_context():
+        category = Category.query.filter_by(category_name="Skincare").first()
+        sub_category = SubCategory.query.filter_by(sub_category_name="Moisturizer").first()
+        db.session.add(Product(product_name="Glow Serum", price=30, stock_qty=5,
+                               category_id=category.id, sub_category_id=sub_category.id))
+        balm = Product.query.filter_by(product_name="Soothing Red Balm").first()
+        balm.status = False
+        db.session.commit()
+
+    index = test_client.application.extensions['suggest_index']
+    built_at = index.built_at
+
+    names = [s['name'] for s in test_client.get('/api/search/suggest?prefix=glow').get_json()['suggestions']]
+    assert names == ["Glow Serum"]
+    names = [s['name'] for s in test_client.get('/api/search/suggest?prefix=red').get_json()['suggestions']]
+    assert names == ["Ruby Red Lipstick"]
+    # Applied in place, not by rebuilding from the database
+    assert index.built_at == built_at
+
+def test_search_falls_back_to_fuzzy_matching(test_client, sample_data):
+    """Misspelt terms still find products once exact matching returns too few hits"""
+    data = test_client.get('/api/search/?q=moisturiser').get_json()
+    assert data['fuzzy'] is True
+    assert data['products'][0]['product_name'] == "Hydrating Moisturizer"
+
+    data = test_client.get('/api/search/?q=lipstik').get_json()
+    assert [p['product_name'] for p in data['products']] == ["Ruby Red Lipstick"]
+
+def test_search_skips_fuzzy_when_exact_hits_suffice(test_client, sample_data):
+    test_client.application.config['FUZZY_SEARCH_MIN_RESULTS'] = 1
+    data = test_client.get('/api/search/?q=Red').get_json()
+    assert data['fuzzy'] is False
+    assert len(data['products']) == 2
+
+def test_trigram_index_scores_close_spellings():
+    from uuid import uuid4
+    from server.app.utils.trigram import TrigramIndex
+
+    index = TrigramIndex()
+    maybelline, neutrogena, other = uuid4(), uuid4(), uuid4()
+    index.add(maybelline, "Maybelline Sky High Mascara", "Lengthening mascara")
+    index.add(neutrogena, "Neutrogena Hydro Boost", "Water gel moisturiser")
+    index.add(other, "Velvet Matte Lipstick", "Long wear lipstick from Maybelline")
+
+    hits = index.search("Maybeline")
+    assert [pid for pid, _ in hits] == [maybelline, other]
+    assert [pid for pid, _ in index.search("Neutrogina")] == [neutrogena]
+
+    index.remove(maybelline)
+    assert [pid for pid, _ in index.search("Maybeline")] == [other]